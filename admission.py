@@ -0,0 +1,115 @@
+"""Admission control for the expensive parts of a rerun.
+
+Each gate lets a bounded number of callers run at once and a bounded number
+wait behind them. Anyone beyond that, or anyone who waits longer than
+`max_wait` seconds, gets `Busy` straight away so the page can show a
+"busy, retrying" message or fall back to a cached/precomputed result instead
+of timing out.
+
+    python admission.py   # local load test: p50/p99 with and without the gate
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Busy(Exception):
+    def __init__(self, gate, retry_after):
+        super().__init__(f"{gate} is busy, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    def __init__(self, name, max_concurrent, max_queue, max_wait):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    @contextmanager
+    def admit(self):
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                raise Busy(self.name, self.max_wait)
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.max_wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            raise Busy(self.name, self.max_wait)
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+_CORES = os.cpu_count() or 1
+
+# One set of gates per process, shared by every session
+PREDICT_GATE = AdmissionGate('predict', max_concurrent=_CORES, max_queue=4 * _CORES, max_wait=0.5)
+DATA_GATE = AdmissionGate('load_data', max_concurrent=1, max_queue=8, max_wait=2.0)
+IMAGE_GATE = AdmissionGate('image', max_concurrent=2 * _CORES, max_queue=8 * _CORES, max_wait=0.5)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def load_test(n_threads=64, requests_per_thread=20):
+    """Fire concurrent predictions at the real model, once ungated and once
+    through PREDICT_GATE with the precomputed fallback, and report latencies."""
+    import warnings
+    import joblib
+    import pandas as pd
+    import preload
+    import scoring
+
+    warnings.filterwarnings('ignore')
+    model = joblib.load(preload.MODEL_PATH)
+    table = scoring.build_lookup(model)
+    row = {col: cats[0] for col, cats in zip(scoring.INPUT_COLUMNS, model.named_steps['encoding'].categories_)}
+    input_df = pd.DataFrame([row], columns=scoring.INPUT_COLUMNS)
+
+    def ungated():
+        scoring.predict(model, input_df)
+
+    def gated():
+        try:
+            with PREDICT_GATE.admit():
+                scoring.predict(model, input_df)
+        except Busy:
+            scoring.lookup_proba(table, row)
+
+    print(f"{n_threads} threads x {requests_per_thread} predictions")
+    for label, fn in (('ungated', ungated), ('gated', gated)):
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            local = []
+            for _ in range(requests_per_thread):
+                start = time.perf_counter()
+                fn()
+                local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"{label:<8} p50 {_percentile(latencies, 0.50) * 1000:8.1f} ms   "
+              f"p99 {_percentile(latencies, 0.99) * 1000:8.1f} ms   "
+              f"max {max(latencies) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    load_test()
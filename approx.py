@@ -0,0 +1,227 @@
+"""Approximate heart attack rates by answer for very large survey extracts.
+
+A RateEstimator streams the CSV once and keeps a reservoir sample per
+heart attack label (stratified, so the ~5% minority class keeps as many rows
+as the majority), plus the exact number of rows seen per label. Rates for
+each answer of a question are then estimated by reweighting the two strata
+back to their population sizes, with a 95% confidence interval from the
+delta method. Below EXACT_MAX_ROWS rows the exact groupby is used instead.
+
+    python approx.py --benchmark              # latency vs accuracy on data/df.csv
+    python approx.py --benchmark --replicate 10
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import preload
+import scoring
+
+# Datasets up to this many rows are summarized exactly
+EXACT_MAX_ROWS = 1_000_000
+SAMPLE_PER_LABEL = 50_000
+CHUNK_SIZE = 200_000
+Z_95 = 1.96
+
+
+class RateEstimator:
+    def __init__(self, capacity=SAMPLE_PER_LABEL, seed=0):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        # Answers seen per question; a sampled row stores each answer as its
+        # uint8 index in this list, which keeps reservoirs small to store and load
+        self.vocab = [[] for _ in scoring.INPUT_COLUMNS]
+        # Per label: rows seen so far and the reservoir of coded answers
+        self.seen = {0: 0, 1: 0}
+        self.samples = {0: self._empty(), 1: self._empty()}
+        self._rates = {}
+
+    @classmethod
+    def from_csv(cls, path=preload.DATA_PATH, capacity=SAMPLE_PER_LABEL, seed=0):
+        estimator = cls(capacity, seed)
+        for chunk in pd.read_csv(path, chunksize=CHUNK_SIZE, usecols=scoring.INPUT_COLUMNS + [scoring.TARGET]):
+            estimator.add(chunk)
+        return estimator
+
+    @property
+    def total_rows(self):
+        return self.seen[0] + self.seen[1]
+
+    @staticmethod
+    def _empty():
+        return np.empty((0, len(scoring.INPUT_COLUMNS)), dtype=np.uint8)
+
+    def _codes_for(self, col, answers):
+        """uint8 codes for `answers` of question `col`, extending the vocabulary."""
+        vocab = self.vocab[col]
+        index = {answer: i for i, answer in enumerate(vocab)}
+        for answer in answers:
+            if answer not in index:
+                index[answer] = len(vocab)
+                vocab.append(answer)
+        return np.array([index[answer] for answer in answers], dtype=np.uint8)
+
+    def _encode(self, chunk):
+        codes = np.empty((len(chunk), len(scoring.INPUT_COLUMNS)), dtype=np.uint8)
+        for col, column in enumerate(scoring.INPUT_COLUMNS):
+            inverse, uniques = pd.factorize(chunk[column].astype(str))
+            codes[:, col] = self._codes_for(col, list(uniques))[inverse]
+        return codes
+
+    def add(self, chunk):
+        """Feed a DataFrame chunk through the per-label reservoirs (Algorithm R)."""
+        self._rates.clear()
+        labels = chunk[scoring.TARGET].astype(str).isin(scoring.POSITIVE_LABELS).to_numpy()
+        values = self._encode(chunk)
+        for label in (0, 1):
+            rows = values[labels == label]
+            seen = self.seen[label]
+            sample = self.samples[label]
+
+            # Fill the reservoir first
+            n_fill = max(0, min(self.capacity - len(sample), len(rows)))
+            sample = np.concatenate([sample, rows[:n_fill]])
+            rest = rows[n_fill:]
+            if len(rest):
+                # Item number t replaces a random slot with probability capacity / (t + 1);
+                # numpy keeps the last write for repeated slots, as a sequential pass would
+                t = seen + n_fill + np.arange(len(rest))
+                slots = (self.rng.random(len(rest)) * (t + 1)).astype(np.int64)
+                keep = slots < self.capacity
+                sample[slots[keep]] = rest[keep]
+
+            self.samples[label] = sample
+            self.seen[label] = seen + len(rows)
+
+    @classmethod
+    def merge(cls, estimators, seed=0):
+        """Combine estimators built on disjoint partitions into one whose
+        reservoirs are uniform samples of the union, without rereading data.
+
+        For each label the number of merged rows taken from a partition
+        follows the hypergeometric distribution over the partitions' row
+        counts, then that many rows are drawn from its reservoir."""
+        capacity = min(e.capacity for e in estimators)
+        merged = cls(capacity, seed)
+        # Translate every estimator's codes into the merged vocabulary
+        recoded = []
+        for est in estimators:
+            mapping = [merged._codes_for(col, vocab) for col, vocab in enumerate(est.vocab)]
+            recoded.append({label: np.column_stack([m[sample[:, col]] for col, m in enumerate(mapping)])
+                            if len(sample) else merged._empty()
+                            for label, sample in est.samples.items()})
+
+        for label in (0, 1):
+            sample, seen = merged._empty(), 0
+            for est, samples in zip(estimators, recoded):
+                other, other_seen = samples[label], est.seen[label]
+                if other_seen == 0:
+                    continue
+                size = min(capacity, seen + other_seen)
+                k = merged.rng.hypergeometric(seen, other_seen, size) if seen else 0
+                mine = merged.rng.choice(len(sample), k, replace=False)
+                theirs = merged.rng.choice(len(other), size - k, replace=False)
+                sample, seen = np.concatenate([sample[mine], other[theirs]]), seen + other_seen
+            merged.samples[label], merged.seen[label] = sample, seen
+        return merged
+
+    def rates(self, column):
+        """Estimated rate per answer of `column`, with a 95% CI."""
+        if column not in self._rates:
+            self._rates[column] = self._estimate(column)
+        return self._rates[column]
+
+    def _estimate(self, column):
+        col = scoring.INPUT_COLUMNS.index(column)
+        vocab = self.vocab[col]
+        counts = {label: np.bincount(sample[:, col], minlength=len(vocab))
+                  for label, sample in self.samples.items()}
+        present = (counts[0] + counts[1]) > 0
+        groups = np.array(vocab, dtype=object)[present]
+
+        N0, N1 = self.seen[0], self.seen[1]
+        n0, n1 = max(len(self.samples[0]), 1), max(len(self.samples[1]), 1)
+        p0 = counts[0][present] / n0
+        p1 = counts[1][present] / n1
+
+        # Rate in group g = N1*p1 / (N1*p1 + N0*p0); var(p_h) is binomial with
+        # the finite population correction, so a full reservoir has zero error
+        a, b = N1 * p1, N0 * p0
+        total = a + b
+        rate = np.divide(a, total, out=np.full(len(groups), np.nan), where=total > 0)
+        var0 = p0 * (1 - p0) / n0 * max(0.0, 1 - n0 / max(N0, 1))
+        var1 = p1 * (1 - p1) / n1 * max(0.0, 1 - n1 / max(N1, 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d1 = N1 * b / total ** 2
+            d0 = -N0 * a / total ** 2
+            se = np.sqrt(d1 ** 2 * var1 + d0 ** 2 * var0)
+        return pd.DataFrame({
+            'answer': groups,
+            'rate': rate,
+            'ci_low': np.clip(rate - Z_95 * se, 0, 1),
+            'ci_high': np.clip(rate + Z_95 * se, 0, 1),
+            'respondents': np.round(total).astype(int),
+        }).sort_values('answer', ignore_index=True)
+
+
+def exact_rates(df, column):
+    y = df[scoring.TARGET].astype(str).isin(scoring.POSITIVE_LABELS)
+    grouped = y.groupby(df[column].astype(str), observed=True)
+    out = pd.DataFrame({'rate': grouped.mean(), 'respondents': grouped.size()}).reset_index(names='answer')
+    out['ci_low'] = out['ci_high'] = out['rate']
+    return out[['answer', 'rate', 'ci_low', 'ci_high', 'respondents']].sort_values('answer', ignore_index=True)
+
+
+def group_rates(estimator, exact, column, exact_max_rows=None):
+    """Rates for `column`: exact when the dataset has at most `exact_max_rows`
+    rows (default EXACT_MAX_ROWS), otherwise from the sample. `exact(column)`
+    is only called on the exact path. Returns (DataFrame, is_exact)."""
+    if exact_max_rows is None:
+        exact_max_rows = EXACT_MAX_ROWS
+    if estimator.total_rows <= exact_max_rows:
+        return exact(column), True
+    return estimator.rates(column), False
+
+
+def benchmark(path=preload.DATA_PATH, replicate=1, capacities=(5_000, 20_000, 50_000, 200_000)):
+    df = pd.read_csv(path, usecols=scoring.INPUT_COLUMNS + [scoring.TARGET])
+    if replicate > 1:
+        df = pd.concat([df] * replicate, ignore_index=True)
+    print(f"{len(df):,} rows, {len(scoring.INPUT_COLUMNS)} questions\n")
+
+    start = time.perf_counter()
+    exact = {col: exact_rates(df, col).set_index('answer') for col in scoring.INPUT_COLUMNS}
+    exact_ms = (time.perf_counter() - start) * 1000 / len(scoring.INPUT_COLUMNS)
+    print(f"{'method':<16} {'ms/question':>12} {'max abs err':>12} {'CI coverage':>12}")
+    print(f"{'exact':<16} {exact_ms:>12.1f} {0:>12.4f} {'-':>12}")
+
+    for capacity in capacities:
+        estimator = RateEstimator(capacity)
+        for start_row in range(0, len(df), CHUNK_SIZE):
+            estimator.add(df.iloc[start_row:start_row + CHUNK_SIZE])
+        start = time.perf_counter()
+        estimates = {col: estimator.rates(col).set_index('answer') for col in scoring.INPUT_COLUMNS}
+        approx_ms = (time.perf_counter() - start) * 1000 / len(scoring.INPUT_COLUMNS)
+
+        errors, covered = [], []
+        for col in scoring.INPUT_COLUMNS:
+            joined = exact[col][['rate']].join(estimates[col], rsuffix='_est', how='inner')
+            errors.extend((joined['rate_est'] - joined['rate']).abs())
+            # With a reservoir holding every row the interval collapses onto the
+            # exact rate, which float rounding would otherwise count as a miss
+            tol = 1e-9
+            covered.extend((joined['ci_low'] - tol <= joined['rate']) & (joined['rate'] <= joined['ci_high'] + tol))
+        print(f"{f'sample {capacity:,}/label':<16} {approx_ms:>12.1f} {np.nanmax(errors):>12.4f} "
+              f"{np.mean(covered):>12.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--data', default=preload.DATA_PATH)
+    parser.add_argument('--replicate', type=int, default=1, help='stack the dataset this many times')
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args.data, args.replicate)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import sys
+
+import streamlit as st
+
+import admission
+
+# Repo-relative paths so the app works wherever it is checked out
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, 'static')
+MANIFEST_PATH = os.path.join(STATIC_DIR, 'manifest.json')
+
+# Width (px) each image is displayed at in streamlit_app.py
+DISPLAY_WIDTHS = {
+    'src/Heart_Attack_Occurrence_Distribution.png': 600,
+    'src/heart_attack_age_group.png': 1000,
+    'src/heart_attack_gender.png': 1000,
+    'src/heart_attack_smoker_status.png': 1000,
+    'src/heart_attack_bmi_category.png': 1000,
+    'src/heart_attack_general_health.png': 1000,
+    'src/heart_attack_had_angina.png': 1000,
+    'src/project_flowchart.png': 800,
+    'src/recall_scores.png': 1000,
+    'src/false_positive_rate.png': 1000,
+    'src/ROC_AUC_curve.png': 1000,
+    'src/model_limitations_age_category.png': 1000,
+    'src/model_limitations_had_angina.png': 1000,
+    'src/model_coefficients.png': 1000,
+}
+
+WEBP_QUALITY = 85
+
+
+def build_assets(scale=1.0):
+    """Resize every displayed image to its display width, encode it as WebP
+    and write it to static/ under a content-hashed filename."""
+    from PIL import Image
+
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    manifest = {}
+    for rel_path, width in DISPLAY_WIDTHS.items():
+        with Image.open(os.path.join(APP_DIR, rel_path)) as im:
+            target = min(int(width * scale), im.width)
+            height = round(im.height * target / im.width)
+            resized = im.resize((target, height), Image.LANCZOS)
+            tmp_path = os.path.join(STATIC_DIR, '.tmp.webp')
+            resized.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=6)
+
+        with open(tmp_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(rel_path))[0]
+        file_name = f"{stem}.{digest}.webp"
+        os.replace(tmp_path, os.path.join(STATIC_DIR, file_name))
+        manifest[rel_path] = {'file': file_name, 'hash': digest, 'width': target}
+
+    # Drop images left over from previous builds
+    current = {entry['file'] for entry in manifest.values()}
+    for name in os.listdir(STATIC_DIR):
+        if name.endswith('.webp') and name not in current:
+            os.remove(os.path.join(STATIC_DIR, name))
+
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+@st.cache_resource
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def image(path, width):
+    """Render an image from the static build, falling back to st.image on the
+    original file when no build is available."""
+    entry = load_manifest().get(path)
+    if entry and os.path.exists(os.path.join(STATIC_DIR, entry['file'])):
+        # Filenames are content-hashed, so the URL changes whenever the image does
+        url = f"app/static/{entry['file']}?v={entry['hash']}"
+        st.markdown(f"<img src='{url}' width='{width}' style='max-width: 100%; height: auto;' loading='lazy'>",
+                    unsafe_allow_html=True)
+    else:
+        # Decoding and re-encoding the original PNG is expensive, so bound it
+        try:
+            with admission.IMAGE_GATE.admit():
+                st.image(os.path.join(APP_DIR, path), width=width)
+        except admission.Busy:
+            st.caption("⏳ Chart skipped while the server is busy, it will load on your next interaction.")
+
+
+@st.cache_resource
+def read_binary(rel_path):
+    """Read a repo file once per process; reruns reuse the same bytes."""
+    with open(os.path.join(APP_DIR, rel_path), 'rb') as f:
+        return f.read()
+
+
+if __name__ == '__main__':
+    # Usage: python assets.py [scale]
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    for rel_path, entry in build_assets(scale).items():
+        print(f"{rel_path} -> static/{entry['file']} ({entry['width']}px)")
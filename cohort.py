@@ -0,0 +1,123 @@
+"""Cohort queries over a Parquet copy of the survey dataset.
+
+The Parquet copy stores every answer column dictionary-encoded and the
+heart attack label as 0/1, sorted so that row groups cover narrow ranges of
+the most selective questions. Queries run on pyarrow's dataset engine: the
+filter is pushed down to the Parquet reader, which skips row groups using
+their statistics and only decodes the columns it needs.
+
+The copy is rebuilt by one process at a time under data/parquet/.lock and
+written to a temporary name before being moved into place.
+
+    python cohort.py          # (re)build data/parquet/ from data/df.csv
+"""
+import fcntl
+import os
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import preload
+import scoring
+
+PARQUET_DIR = 'data/parquet'
+PARQUET_FILE = os.path.join(PARQUET_DIR, 'df.parquet')
+ROW_GROUP_SIZE = 64 * 1024
+# Sort keys for the Parquet copy, most commonly filtered first
+SORT_COLUMNS = ['age_category', 'sex', 'had_angina', 'smoker_status']
+
+
+def build_parquet(csv_path=preload.DATA_PATH, parquet_path=PARQUET_FILE):
+    table = pv.read_csv(csv_path)
+    table = table.select(scoring.INPUT_COLUMNS + [scoring.TARGET])
+    label = pc.is_in(pc.cast(table[scoring.TARGET], pa.string()), pa.array(scoring.POSITIVE_LABELS))
+    table = table.set_column(table.schema.get_field_index(scoring.TARGET), scoring.TARGET,
+                             pc.cast(label, pa.int8()))
+    table = table.sort_by([(col, 'ascending') for col in SORT_COLUMNS])
+    for col in scoring.INPUT_COLUMNS:
+        table = table.set_column(table.schema.get_field_index(col), col,
+                                 pc.dictionary_encode(pc.cast(table[col], pa.string())))
+
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    # Dot-prefixed so dataset discovery never picks up a half-written file, and
+    # unique per process and thread so concurrent builds never share one
+    tmp_path = os.path.join(os.path.dirname(parquet_path),
+                            f".{os.path.basename(parquet_path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, use_dictionary=True,
+                       write_statistics=True, compression='zstd')
+        os.replace(tmp_path, parquet_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def ensure_parquet(csv_path=preload.DATA_PATH, parquet_path=PARQUET_FILE):
+    """Build the Parquet copy if it is missing or older than the CSV."""
+    def stale():
+        return not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path)
+    if not stale():
+        return
+    os.makedirs(PARQUET_DIR, exist_ok=True)
+    # Only one process rebuilds; the others wait and then find it up to date
+    with open(os.path.join(PARQUET_DIR, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if stale():
+            build_parquet(csv_path, parquet_path)
+
+
+def open_dataset(path=PARQUET_DIR):
+    return ds.dataset(path, format='parquet')
+
+
+def categories(dataset):
+    """Answer options per question. Each file is read one column at a time, so
+    only a single column's dictionary codes are ever in memory."""
+    options = {}
+    for col in scoring.INPUT_COLUMNS:
+        answers = set()
+        for path in dataset.files:
+            for chunk in pq.read_table(path, columns=[col])[col].chunks:
+                if pa.types.is_dictionary(chunk.type):
+                    # Only the answers actually used in this chunk
+                    chunk = chunk.dictionary.take(pc.unique(chunk.indices))
+                answers.update(value for value in pc.unique(chunk).to_pylist() if value is not None)
+        options[col] = sorted(answers)
+    return options
+
+
+def normalize(filters):
+    """Canonical, hashable form of {column: [values]} used as the cache key:
+    empty selections dropped, columns and values sorted."""
+    return tuple(sorted((col, tuple(sorted(values))) for col, values in filters.items() if values))
+
+
+def query(dataset, filters):
+    """Respondent count, heart attack cases and rate for a normalized filter."""
+    start = time.perf_counter()
+    expression = None
+    for col, values in filters:
+        condition = ds.field(col).isin(list(values))
+        expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(columns=[scoring.TARGET], filter=expression)
+    count = table.num_rows
+    cases = pc.sum(table[scoring.TARGET]).as_py() or 0
+    return {
+        'count': count,
+        'cases': cases,
+        'rate': cases / count if count else None,
+        'query_ms': (time.perf_counter() - start) * 1000,
+    }
+
+
+if __name__ == '__main__':
+    build_parquet()
+    dataset = open_dataset()
+    print(f"Wrote {PARQUET_FILE}: {dataset.count_rows()} rows")
+    print(query(dataset, ()))
@@ -0,0 +1,148 @@
+"""Global feature importance of the shipped model, per survey question.
+
+Two views, both grouped by question rather than by one-hot column:
+- permutation importance: drop in test ROC AUC when one question's answers
+  are shuffled, on the held-out split from train.py. Shuffling the raw
+  column permutes all of its one-hot columns together. For the shipped
+  pipeline the model is a sum of per-answer log-odds terms, so a shuffle
+  only swaps one precomputed term; questions are scored in parallel on all
+  cores. Other pipelines fall back to sklearn on EVAL_MAX_ROWS test rows.
+- coefficients: the log-odds contribution of every answer (scoring.build_lookup),
+  summarized per question as the swing between its lowest and highest risk answer.
+
+Results are stored under .cache/importance/<model sha256>.json, so they are
+computed once per model artifact and shared by every process; stores for
+other checksums are removed when a new one is written (see store.py).
+
+    python importance.py      # compute for the current model
+"""
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.inspection import permutation_importance
+from sklearn.metrics import roc_auc_score
+
+import preload
+import scoring
+import store
+import train
+
+STORE_DIR = '.cache/importance'
+N_REPEATS = 10
+# Test rows used by the sklearn fallback, which reruns the whole pipeline
+EVAL_MAX_ROWS = 50_000
+
+
+def store_path(checksum):
+    return store.path(STORE_DIR, checksum, '.json')
+
+
+def coefficients(model):
+    """Per-answer log-odds contributions and per-question swing, or None if
+    the pipeline is not encoding -> scaler -> logreg."""
+    table = scoring.build_lookup(model)
+    if table is None:
+        return None
+    answers, questions = [], []
+    for col in scoring.INPUT_COLUMNS:
+        contributions = table['contributions'][col]
+        # Relative to the question's lowest-risk answer, so values read as odds ratios
+        base = min(contributions.values())
+        answers += [{'question': col, 'answer': answer, 'log_odds': float(value - base)}
+                    for answer, value in contributions.items()]
+        questions.append({'question': col, 'log_odds_swing': float(max(contributions.values()) - base)})
+    return {'questions': questions, 'answers': answers}
+
+
+def _lookup_auc_drops(table, X, y, n_repeats, n_jobs):
+    """Permutation importance from per-answer log-odds terms: shuffling a
+    question only swaps its term, so each repeat is one column update and an
+    AUC instead of a full pipeline prediction."""
+    # Answers the encoder never saw get an all-zero one-hot row, i.e. no term
+    terms = np.column_stack([X[col].astype(str).map(table['contributions'][col]).fillna(0.0).to_numpy(float)
+                             for col in scoring.INPUT_COLUMNS])
+    logit = terms.sum(axis=1)
+    baseline = roc_auc_score(y, logit)
+
+    def drops(j, seed):
+        rng = np.random.default_rng(seed)
+        shuffled = [roc_auc_score(y, logit - terms[:, j] + terms[rng.permutation(len(y)), j])
+                    for _ in range(n_repeats)]
+        return baseline - np.array(shuffled)
+
+    seeds = np.random.SeedSequence(train.RANDOM_STATE).spawn(len(scoring.INPUT_COLUMNS))
+    # roc_auc_score spends its time in numpy sorts, which release the GIL
+    return Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(drops)(j, seed) for j, seed in enumerate(seeds))
+
+
+def permutation(model, data_path=preload.DATA_PATH, n_repeats=N_REPEATS, n_jobs=-1):
+    """Mean and std of the ROC AUC drop per question on the test split."""
+    X, y = train.load_training_data(data_path)
+    _, X_test, _, y_test = train.split(X, y)
+    table = scoring.build_lookup(model)
+    if table is not None:
+        rows = len(X_test)
+        importances = _lookup_auc_drops(table, X_test, y_test, n_repeats, n_jobs)
+    else:
+        rows = min(EVAL_MAX_ROWS, len(X_test))
+        importances = permutation_importance(
+            model, X_test[scoring.INPUT_COLUMNS], y_test, scoring='roc_auc', n_repeats=n_repeats,
+            n_jobs=n_jobs, random_state=train.RANDOM_STATE, max_samples=rows).importances
+    return {
+        'rows': int(rows),
+        'questions': [{'question': col, 'auc_drop': float(np.mean(drops)), 'auc_drop_std': float(np.std(drops))}
+                      for col, drops in zip(scoring.INPUT_COLUMNS, importances)],
+    }
+
+
+def _read_store(path, expected_data_version):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        stored = json.load(f)
+    if stored['data_version'] != expected_data_version:
+        return None
+    return stored
+
+
+def load_importance(model, checksum, data_path=preload.DATA_PATH, n_jobs=-1):
+    """Stored importance for (model checksum, dataset), computing and storing
+    it first if needed. Permutation importance is None without the dataset."""
+    version = preload.data_version(data_path) if os.path.exists(data_path) else None
+
+    def build():
+        return {
+            'model_sha256': checksum,
+            'data_version': version,
+            'coefficients': coefficients(model),
+            'permutation': permutation(model, data_path, n_jobs=n_jobs) if version else None,
+        }
+
+    def write(stored, path):
+        with open(path, 'w') as f:
+            json.dump(stored, f)
+    return store.load(STORE_DIR, checksum, '.json', lambda path: _read_store(path, version), build, write)
+
+
+def question_table(stored):
+    """One row per question with every available importance measure."""
+    table = pd.DataFrame({'question': scoring.INPUT_COLUMNS})
+    if stored['coefficients']:
+        table = table.merge(pd.DataFrame(stored['coefficients']['questions']), on='question')
+        table['odds_ratio_swing'] = np.exp(table['log_odds_swing'])
+    if stored['permutation']:
+        table = table.merge(pd.DataFrame(stored['permutation']['questions']), on='question')
+    return table
+
+
+if __name__ == '__main__':
+    checksum = preload.model_version()
+    stored = load_importance(joblib.load(preload.MODEL_PATH), checksum)
+    table = question_table(stored)
+    key = 'auc_drop' if stored['permutation'] else 'log_odds_swing'
+    print(table.sort_values(key, ascending=False).to_string(index=False))
@@ -0,0 +1,219 @@
+"""Append a new survey wave without recomputing anything for earlier waves.
+
+    python ingest.py brfss_2024.csv --wave 2024
+
+Each wave becomes its own partition:
+- data/parquet/wave=<name>/part.parquet   queried by the cohort builder
+- data/derived/wave=<name>/aggregates.json  per-answer row and case counts
+- data/derived/wave=<name>/reservoir.joblib  stratified sample for approx.py
+
+data/df.csv is the 'base' partition; its derived files are rebuilt only when
+the file changes, by one process at a time under data/derived/.lock. Every
+file is written to a temporary name and moved into place, so a reader never
+sees a partial one. The app combines partitions by summing their aggregates
+and merging their reservoirs, so ingesting a wave only scans that wave.
+"""
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+import joblib
+import pandas as pd
+
+import approx
+import cohort
+import preload
+import scoring
+
+DERIVED_DIR = 'data/derived'
+BASE = 'base'
+
+
+def expected_answers(model_path=preload.MODEL_PATH):
+    """Allowed answers per question: the categories the model was fitted on."""
+    encoder = joblib.load(model_path).named_steps['encoding']
+    return {col: set(cats) for col, cats in zip(encoder.feature_names_in_, encoder.categories_)}
+
+
+def validate(df, answers):
+    """Return a list of problems with `df` against the 19-feature schema."""
+    missing = [col for col in scoring.INPUT_COLUMNS + [scoring.TARGET] if col not in df.columns]
+    if missing:
+        return [f"missing columns: {', '.join(missing)}"]
+    problems = []
+    for col in scoring.INPUT_COLUMNS:
+        unknown = set(df[col].dropna().astype(str).unique()) - answers[col]
+        if unknown:
+            problems.append(f"{col}: unexpected answers {sorted(unknown)}")
+        if df[col].isna().any():
+            problems.append(f"{col}: {df[col].isna().sum()} missing values")
+    labels = set(df[scoring.TARGET].dropna().astype(str).unique())
+    if not labels <= set(scoring.POSITIVE_LABELS) | {'No', '0', 'False'}:
+        problems.append(f"{scoring.TARGET}: unexpected labels {sorted(labels)}")
+    if df[scoring.TARGET].isna().any():
+        problems.append(f"{scoring.TARGET}: {df[scoring.TARGET].isna().sum()} missing labels")
+    return problems
+
+
+def aggregates(df):
+    """Row and heart attack counts per answer of every question."""
+    y = df[scoring.TARGET].astype(str).isin(scoring.POSITIVE_LABELS).astype(int)
+    questions = {}
+    for col in scoring.INPUT_COLUMNS:
+        grouped = y.groupby(df[col].astype(str))
+        questions[col] = {answer: [int(n), int(cases)]
+                          for answer, n, cases in zip(grouped.size().index, grouped.size(), grouped.sum())}
+    return {'rows': int(len(df)), 'cases': int(y.sum()), 'questions': questions}
+
+
+def merge_aggregates(parts):
+    merged = {'rows': 0, 'cases': 0, 'questions': {col: {} for col in scoring.INPUT_COLUMNS}}
+    for part in parts:
+        merged['rows'] += part['rows']
+        merged['cases'] += part['cases']
+        for col, counts in part['questions'].items():
+            for answer, (n, cases) in counts.items():
+                total = merged['questions'][col].setdefault(answer, [0, 0])
+                total[0] += n
+                total[1] += cases
+    return merged
+
+
+def exact_rates(merged, column):
+    """approx.exact_rates computed from merged aggregates instead of rows."""
+    counts = merged['questions'][column]
+    out = pd.DataFrame({
+        'answer': list(counts),
+        'respondents': [n for n, _ in counts.values()],
+        'rate': [cases / n if n else float('nan') for n, cases in counts.values()],
+    })
+    out['ci_low'] = out['ci_high'] = out['rate']
+    return out[['answer', 'rate', 'ci_low', 'ci_high', 'respondents']].sort_values('answer', ignore_index=True)
+
+
+@contextmanager
+def _locked():
+    """Serialize writers to DERIVED_DIR across processes."""
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+    with open(os.path.join(DERIVED_DIR, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _replace(path, write):
+    """Write a file with `write(tmp_path)`, then move it into place."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_derived(name, df, source_version=None):
+    path = os.path.join(DERIVED_DIR, name)
+    os.makedirs(path, exist_ok=True)
+    estimator = approx.RateEstimator()
+    estimator.add(df)
+    _replace(os.path.join(path, 'reservoir.joblib'), lambda tmp_path: joblib.dump(estimator, tmp_path))
+    summary = aggregates(df)
+    summary['source_version'] = source_version
+
+    def dump(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(summary, f)
+    # aggregates.json is written last and marks the partition as complete
+    _replace(os.path.join(path, 'aggregates.json'), dump)
+
+
+def wave_names():
+    if not os.path.isdir(DERIVED_DIR):
+        return []
+    return sorted(name for name in os.listdir(DERIVED_DIR)
+                  if name.startswith('wave=') and os.path.exists(os.path.join(DERIVED_DIR, name, 'aggregates.json')))
+
+
+def version():
+    """Changes when the base dataset changes or a wave is ingested."""
+    base = preload.data_version() if os.path.exists(preload.DATA_PATH) else None
+    return base, tuple(wave_names())
+
+
+def _read_aggregates(name):
+    with open(os.path.join(DERIVED_DIR, name, 'aggregates.json')) as f:
+        return json.load(f)
+
+
+def ensure_base():
+    """(Re)build the base partition's derived files if df.csv changed."""
+    current = preload.data_version()
+    path = os.path.join(DERIVED_DIR, BASE, 'aggregates.json')
+
+    def up_to_date():
+        return os.path.exists(path) and _read_aggregates(BASE).get('source_version') == current
+    if up_to_date():
+        return
+    # Only one process rebuilds; the others wait and then find it up to date
+    with _locked():
+        if up_to_date():
+            return
+        df = pd.read_csv(preload.DATA_PATH, usecols=scoring.INPUT_COLUMNS + [scoring.TARGET])
+        write_derived(BASE, df, source_version=current)
+
+
+def load_summary():
+    """Merged aggregates and rate estimator over the base and every wave."""
+    names = []
+    if os.path.exists(preload.DATA_PATH):
+        ensure_base()
+        names.append(BASE)
+    names += wave_names()
+    merged = merge_aggregates(_read_aggregates(name) for name in names)
+    estimators = [joblib.load(os.path.join(DERIVED_DIR, name, 'reservoir.joblib')) for name in names]
+    return merged, approx.RateEstimator.merge(estimators) if estimators else approx.RateEstimator()
+
+
+def ingest(csv_path, wave):
+    name = f"wave={wave}"
+    if name in wave_names():
+        raise ValueError(f"wave {wave} has already been ingested")
+    df = pd.read_csv(csv_path)
+    problems = validate(df, expected_answers())
+    if problems:
+        raise ValueError("wave does not match the survey schema:\n  " + "\n  ".join(problems))
+
+    parquet_path = os.path.join(cohort.PARQUET_DIR, name, 'part.parquet')
+    with _locked():
+        # Checked again in case another ingest of this wave finished meanwhile
+        if name in wave_names():
+            raise ValueError(f"wave {wave} has already been ingested")
+        try:
+            cohort.build_parquet(csv_path, parquet_path)
+            write_derived(name, df[scoring.INPUT_COLUMNS + [scoring.TARGET]])
+        except BaseException:
+            # Leave no half-ingested partition behind
+            shutil.rmtree(os.path.dirname(parquet_path), ignore_errors=True)
+            shutil.rmtree(os.path.join(DERIVED_DIR, name), ignore_errors=True)
+            raise
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('csv', help='CSV of the new wave (19 features + target)')
+    parser.add_argument('--wave', required=True, help='wave name, e.g. the survey year')
+    args = parser.parse_args()
+    try:
+        rows = ingest(args.csv, args.wave)
+    except ValueError as e:
+        parser.exit(1, f"error: {e}\n")
+    print(f"Ingested wave {args.wave}: {rows} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Run several Streamlit workers on one host that share one copy of the model
+and the EDA dataset.
+
+    python launcher.py                         # serve on ports 8601-8604
+    python launcher.py --workers 8             # ports 8601-8608; add them to nginx.conf
+    python launcher.py --workers 4 --measure   # compare memory with independent processes
+
+The parent loads the model and data once (preload.preload) and then forks the
+workers, which share those pages copy-on-write. Put deploy/nginx.conf in front
+of the workers to expose them on a single port. Its upstream block lists one
+server per worker, so DEFAULT_WORKERS matches it; with --workers, the
+launcher prints the server lines to use.
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+
+import preload
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_SCRIPT = os.path.join(APP_DIR, 'streamlit_app.py')
+BASE_PORT = 8601
+# Number of upstream servers in deploy/nginx.conf
+DEFAULT_WORKERS = 4
+
+
+def run_worker(port):
+    from streamlit.web import bootstrap
+
+    flag_options = {
+        'server.port': port,
+        'server.address': '127.0.0.1',
+        'server.headless': True,
+        # The proxy in front is the only client, and all workers serve the same files
+        'server.enableCORS': False,
+        'server.enableXsrfProtection': False,
+    }
+    bootstrap.load_config_options(flag_options)
+    bootstrap.run(APP_SCRIPT, False, [], flag_options)
+
+
+def start_workers(n_workers, shared=True, base_port=BASE_PORT):
+    """Fork one Streamlit server per port. With shared=False every worker loads
+    its own model and data after the fork, like independent `streamlit run`
+    processes do."""
+    if shared:
+        preload.preload()
+
+    pids = []
+    for i in range(n_workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                if not shared:
+                    preload.preload()
+                run_worker(base_port + i)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    return pids
+
+
+def stop_workers(pids):
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+def memory_usage(pid):
+    """Return RSS, PSS and USS in MB for a process (Linux only).
+
+    RSS counts shared pages in full for every process; PSS splits them between
+    the processes sharing them, so summing PSS gives the real footprint."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return fields.get('Rss', 0), fields.get('Pss', 0), uss
+
+
+def measure(n_workers, settle_seconds=15):
+    print(f"{'mode':<12} {'worker':>6} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8}")
+    totals = {}
+    for shared in (False, True):
+        mode = 'shared' if shared else 'independent'
+        pids = start_workers(n_workers, shared=shared)
+        try:
+            time.sleep(settle_seconds)
+            total_pss = 0.0
+            for i, pid in enumerate(pids):
+                rss, pss, uss = memory_usage(pid)
+                total_pss += pss
+                print(f"{mode:<12} {i:>6} {rss:>8.1f} {pss:>8.1f} {uss:>8.1f}")
+            totals[mode] = total_pss
+        finally:
+            stop_workers(pids)
+    print(f"\nTotal PSS for {n_workers} workers: "
+          f"independent {totals['independent']:.1f} MB, shared {totals['shared']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'workers to start (default {DEFAULT_WORKERS}, as in deploy/nginx.conf)')
+    parser.add_argument('--base-port', type=int, default=BASE_PORT)
+    parser.add_argument('--measure', action='store_true',
+                        help='print per-worker memory for shared vs independent workers and exit')
+    args = parser.parse_args()
+
+    # Model and data paths are relative to the repo root
+    os.chdir(APP_DIR)
+    if args.measure:
+        measure(args.workers)
+        return
+
+    pids = start_workers(args.workers, base_port=args.base_port)
+    ports = ', '.join(str(args.base_port + i) for i in range(args.workers))
+    print(f"Started {args.workers} workers on ports {ports}")
+    if args.workers != DEFAULT_WORKERS or args.base_port != BASE_PORT:
+        print("Set the upstream block in deploy/nginx.conf to:")
+        for i in range(args.workers):
+            print(f"    server 127.0.0.1:{args.base_port + i};")
+
+    def shutdown(signum, frame):
+        stop_workers(pids)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    while True:
+        # Exit if any worker dies so a supervisor can restart the whole group
+        pid, _ = os.wait()
+        if pid in pids:
+            pids.remove(pid)
+            stop_workers(pids)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Each simulated session speaks Streamlit's websocket protocol like a browser:
+it opens the welcome page, navigates with the sidebar buttons to 'predict',
+answers all 19 selectboxes (one rerun per answer), clicks Predict, then opens
+'eda' and 'ml'. Sessions are run at increasing concurrency levels while the
+server's CPU time and memory are sampled from /proc.
+
+    python loadtest.py                          # start a server and ramp 1..64 sessions
+    python loadtest.py --levels 1 4 16 --think 0.5
+    python loadtest.py --url ws://127.0.0.1:8501 --server-pid 1234
+
+Linux only for the server metrics. Uses the `websockets` package, which is
+installed with Streamlit.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+NAV_BUTTONS = {
+    'predict': '📝 Heart Attack Assessment',
+    'eda': '📊 Data Insights',
+    'ml': '🤖 ML Model',
+}
+SCRIPT_DONE = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR)
+
+
+class Session:
+    """One simulated browser tab."""
+
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+        # Widgets rendered by the last run: label -> proto, plus the values we hold
+        self.widgets = {}
+        self.values = {}
+
+    async def connect(self):
+        self.ws = await websockets.connect(f"{self.url}/_stcore/stream", subprotocols=['streamlit'],
+                                           max_size=None)
+
+    async def close(self):
+        await self.ws.close()
+
+    async def rerun(self, trigger=None):
+        """Send the current widget values (plus an optional button click) and
+        wait until the script run that it starts has finished."""
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        for widget_id, value in self.values.items():
+            msg.rerun_script.widget_states.widgets.add(id=widget_id, string_value=value)
+        if trigger is not None:
+            msg.rerun_script.widget_states.widgets.append(WidgetState(id=trigger, trigger_value=True))
+        await self.ws.send(msg.SerializeToString())
+
+        widgets = {}
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof('type')
+            if kind == 'delta' and fwd.delta.WhichOneof('type') == 'new_element':
+                element = fwd.delta.new_element
+                if element.WhichOneof('type') in ('button', 'selectbox'):
+                    widget = getattr(element, element.WhichOneof('type'))
+                    widgets[widget.label] = widget
+            elif kind == 'script_finished':
+                if fwd.script_finished in SCRIPT_DONE:
+                    break
+                # st.rerun() from a nav button starts a second run; keep only its widgets
+                widgets = {}
+
+        self.widgets = widgets
+        live_ids = {w.id for w in widgets.values()}
+        self.values = {k: v for k, v in self.values.items() if k in live_ids}
+
+    async def click(self, label):
+        await self.rerun(trigger=self.widgets[label].id)
+
+    async def choose(self, label, option):
+        self.values[self.widgets[label].id] = option
+        await self.rerun()
+
+
+async def run_flow(url, think, rng):
+    """Walk one session through welcome -> predict -> eda -> ml and return
+    (step, seconds) pairs."""
+    timings = []
+    session = Session(url)
+
+    async def step(name, coro):
+        start = time.perf_counter()
+        await coro
+        timings.append((name, time.perf_counter() - start))
+        if think:
+            await asyncio.sleep(think)
+
+    await step('connect', session.connect())
+    try:
+        await step('welcome', session.rerun())
+        await step('predict', session.click(NAV_BUTTONS['predict']))
+        selectboxes = [w for w in session.widgets.values() if w.DESCRIPTOR.name == 'Selectbox']
+        for widget in selectboxes:
+            await step('answer', session.choose(widget.label, rng.choice(list(widget.options))))
+        await step('score', session.click('Predict'))
+        await step('eda', session.click(NAV_BUTTONS['eda']))
+        await step('ml', session.click(NAV_BUTTONS['ml']))
+    finally:
+        await session.close()
+    return timings
+
+
+def read_proc(pid):
+    """Return (cpu seconds, RSS MB) for a process from /proc."""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    with open(f'/proc/{pid}/statm') as f:
+        rss = int(f.read().split()[1]) * PAGE_SIZE / 2 ** 20
+    return cpu, rss
+
+
+async def sample_rss(pid, peak, stop):
+    while not stop.is_set():
+        peak[0] = max(peak[0], read_proc(pid)[1])
+        await asyncio.sleep(0.1)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float('nan')
+
+
+async def run_level(url, n_sessions, think, pid, seed):
+    cpu_before, rss_before = read_proc(pid) if pid else (0.0, 0.0)
+    peak, stop = [rss_before], asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(pid, peak, stop)) if pid else None
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_flow(url, think, random.Random(seed + i)) for i in range(n_sessions)),
+        return_exceptions=True)
+    wall = time.perf_counter() - start
+
+    stop.set()
+    if sampler:
+        await sampler
+    cpu_after, _ = read_proc(pid) if pid else (0.0, 0.0)
+
+    flows = [r for r in results if not isinstance(r, BaseException)]
+    errors = [repr(r) for r in results if isinstance(r, BaseException)]
+    steps = {}
+    for flow in flows:
+        for name, seconds in flow:
+            steps.setdefault(name, []).append(seconds)
+    return {
+        'sessions': n_sessions,
+        'completed': len(flows),
+        'errors': errors[:5],
+        'wall_s': wall,
+        'flows_per_s': len(flows) / wall,
+        'steps': {name: {'p50_ms': percentile(v, 0.50) * 1000, 'p95_ms': percentile(v, 0.95) * 1000,
+                         'p99_ms': percentile(v, 0.99) * 1000} for name, v in steps.items()},
+        'cpu_s_per_session': (cpu_after - cpu_before) / n_sessions,
+        'rss_mb_per_session': (peak[0] - rss_before) / n_sessions,
+        'peak_rss_mb': peak[0],
+    }
+
+
+def find_saturation(levels, within=0.9):
+    """The saturation point is the smallest concurrency whose throughput is
+    within 10% of the best error-free throughput; adding sessions beyond it
+    only adds latency."""
+    healthy = [level for level in levels if not level['errors']] or levels
+    best = max(level['flows_per_s'] for level in healthy)
+    return min(level['sessions'] for level in healthy if level['flows_per_s'] >= within * best)
+
+
+def print_report(levels):
+    print(f"\n{'sessions':>8} {'done':>5} {'flows/s':>8} {'CPU s/sess':>10} {'MB/sess':>8} {'peak MB':>8}  step p95 (ms)")
+    for level in levels:
+        p95 = '  '.join(f"{name} {s['p95_ms']:.0f}" for name, s in level['steps'].items())
+        print(f"{level['sessions']:>8} {level['completed']:>5} {level['flows_per_s']:>8.2f} "
+              f"{level['cpu_s_per_session']:>10.2f} {level['rss_mb_per_session']:>8.1f} "
+              f"{level['peak_rss_mb']:>8.1f}  {p95}")
+        for error in level['errors']:
+            print(f"{'':>8} error: {error}")
+    print(f"\nSaturation point: {find_saturation(levels)} concurrent sessions")
+
+
+def start_server(port):
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', 'streamlit_app.py', '--server.port', str(port),
+         '--server.headless', 'true', '--server.enableXsrfProtection', 'false'],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"Streamlit did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='websocket URL of a running app, e.g. ws://127.0.0.1:8501')
+    parser.add_argument('--server-pid', type=int, help='PID of the server at --url, for CPU/memory')
+    parser.add_argument('--port', type=int, default=8599, help='port for the server started without --url')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--think', type=float, default=0.0, help='seconds between user actions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    server = None
+    url, pid = args.url, args.server_pid
+    if url is None:
+        server = start_server(args.port)
+        url, pid = f"ws://127.0.0.1:{args.port}", server.pid
+    try:
+        # Warm the caches so the first level does not pay for loading the model
+        asyncio.run(run_level(url, 1, 0.0, None, args.seed))
+        levels = []
+        for n in args.levels:
+            levels.append(asyncio.run(run_level(url, n, args.think, pid, args.seed)))
+            print(f"{n} sessions: {levels[-1]['flows_per_s']:.2f} flows/s", flush=True)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print_report(levels)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'levels': levels, 'saturation_sessions': find_saturation(levels)}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
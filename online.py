@@ -0,0 +1,177 @@
+"""Incremental model updates from new labelled survey records.
+
+    python online.py new_wave.csv                      # update, check, publish
+    python online.py new_wave.csv --holdout checks.csv
+
+The shipped pipeline's encoder and scaler are kept frozen, so the feature
+space never changes. The logistic regression is replaced by an SGD
+classifier with the same log loss, started from the shipped coefficients and
+updated with mini-batch partial_fit steps. New records are first checked
+against the answers the model was trained on (ingest.validate). Progress is
+checkpointed every few batches together with the checksum of the base
+artifact and how far into the input file it got: a rerun on the same file
+resumes after the last checkpointed batch, and a checkpoint for another base
+artifact is discarded. The updated scorer is only published over
+model/pipeline_logreg_final.joblib if it passes a holdout check against the
+current model.
+"""
+import argparse
+import os
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.pipeline import Pipeline
+from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import train_test_split
+
+import ingest
+import preload
+import scoring
+import train
+
+CHECKPOINT_PATH = '.cache/online/checkpoint.joblib'
+BATCH_SIZE = 1024
+CHECKPOINT_EVERY = 10
+# Allowed drop versus the current model before an update is rejected
+MAX_AUC_DROP = 0.005
+MAX_RECALL_DROP = 0.02
+
+
+def new_classifier(logreg, alpha=1e-5, eta0=1e-4):
+    """SGD log-loss classifier starting from a fitted LogisticRegression."""
+    clf = SGDClassifier(loss='log_loss', alpha=alpha, learning_rate='constant', eta0=eta0,
+                        random_state=train.RANDOM_STATE)
+    # partial_fit keeps coef_/intercept_ that are already set
+    clf.coef_ = logreg.coef_.copy()
+    clf.intercept_ = logreg.intercept_.copy()
+    clf.threshold = logreg.threshold
+    return clf
+
+
+def balanced_weights(y):
+    """Per-sample weights giving both classes equal total weight, matching the
+    balanced (undersampled) data the threshold was chosen on."""
+    weights = np.ones(len(y))
+    for label in (0, 1):
+        count = (y == label).sum()
+        if count:
+            weights[y == label] = len(y) / (2 * count)
+    return weights
+
+
+def load_checkpoint(base_model, model_checksum):
+    """The saved state if it was started from this base artifact, else a
+    fresh one; SGD weights only line up with the encoder and scaler they
+    were trained against."""
+    if os.path.exists(CHECKPOINT_PATH):
+        state = joblib.load(CHECKPOINT_PATH)
+        if state.get('model_sha256') == model_checksum:
+            return state
+    return {'classifier': new_classifier(base_model.named_steps['logreg']), 'batches': 0, 'records': 0,
+            'model_sha256': model_checksum, 'source': None, 'offset': 0}
+
+
+def save_checkpoint(state):
+    os.makedirs(os.path.dirname(CHECKPOINT_PATH), exist_ok=True)
+    tmp_path = f"{CHECKPOINT_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(state, tmp_path)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+def update(base_model, X, y, state, source, batch_size=BATCH_SIZE):
+    """Run partial_fit over (X, y) in mini-batches, checkpointing as it goes.
+
+    `source` identifies the input; rerunning on the same input skips the
+    rows already learned from, so a resumed run sees each record once."""
+    if state['source'] != source:
+        state['source'], state['offset'] = source, 0
+    offset = state['offset']
+    if offset >= len(y):
+        return state
+    features = base_model[:-1].transform(X[scoring.INPUT_COLUMNS].iloc[offset:])
+    y = y[offset:]
+    clf = state['classifier']
+    for start in range(0, len(y), batch_size):
+        X_batch, y_batch = features[start:start + batch_size], y[start:start + batch_size]
+        clf.partial_fit(X_batch, y_batch, classes=[0, 1], sample_weight=balanced_weights(y_batch))
+        state['batches'] += 1
+        state['records'] += len(y_batch)
+        state['offset'] = offset + start + len(y_batch)
+        if state['batches'] % CHECKPOINT_EVERY == 0:
+            save_checkpoint(state)
+    save_checkpoint(state)
+    return state
+
+
+def load_records(path, answers):
+    """(X, y) of a labelled CSV. Raises ValueError listing every problem if
+    it does not match the survey schema."""
+    df = preload.read_data(path)
+    problems = ingest.validate(df, answers)
+    if problems:
+        raise ValueError(f"{path} does not match the survey schema:\n  " + "\n  ".join(problems))
+    return train.features_and_labels(df)
+
+
+def as_pipeline(base_model, clf):
+    return Pipeline(base_model.steps[:-1] + [('logreg', clf)])
+
+
+def holdout_check(current, candidate, X, y):
+    """Return (passed, current metrics, candidate metrics)."""
+    before = train.evaluate(current, X, y)
+    after = train.evaluate(candidate, X, y)
+    passed = (after['roc_auc'] >= before['roc_auc'] - MAX_AUC_DROP
+              and after['recall'] >= before['recall'] - MAX_RECALL_DROP)
+    return passed, before, after
+
+
+def publish(model, path=preload.MODEL_PATH):
+    # Write then rename so the app never loads a half-written file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('records', help='CSV of new labelled records (19 features + target)')
+    parser.add_argument('--holdout', help='CSV to check the update on (default: 10%% of records)')
+    parser.add_argument('--model', default=preload.MODEL_PATH)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help='check but do not publish')
+    args = parser.parse_args()
+
+    current = joblib.load(args.model)
+    answers = ingest.expected_answers(args.model)
+    try:
+        X, y = load_records(args.records, answers)
+        if args.holdout:
+            X_hold, y_hold = load_records(args.holdout, answers)
+    except ValueError as e:
+        parser.exit(1, f"error: {e}\n")
+    if not args.holdout:
+        X, X_hold, y, y_hold = train_test_split(X, y, test_size=0.1, stratify=y,
+                                                random_state=train.RANDOM_STATE)
+
+    # The split above is seeded, so a rerun on the same file sees the same row order
+    source = preload.data_version(args.records)
+    state = load_checkpoint(current, preload.model_version(args.model))
+    state = update(current, X, y, state, source, args.batch_size)
+    candidate = as_pipeline(current, state['classifier'])
+    passed, before, after = holdout_check(current, candidate, X_hold, y_hold)
+
+    print(f"Updated on {state['records']} records in {state['batches']} batches")
+    print(pd.DataFrame({'current': before, 'candidate': after}).round(4).to_string())
+    if passed and not args.dry_run:
+        publish(candidate, args.model)
+        os.remove(CHECKPOINT_PATH)
+        print(f"Published {args.model}")
+    elif not passed:
+        print("Holdout check failed, keeping the current model (checkpoint kept)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Materialized model scores over the survey dataset.
+
+Scoring all of data/df.csv is done once per model artifact and stored as a
+Parquet column under .cache/predictions/<model sha256>.parquet, so it is
+shared by every process and survives restarts. A different artifact has a
+different checksum and therefore a different file; stores for other
+checksums are removed when a new one is written (see store.py). The store
+also records which version of the dataset it scored and is rebuilt when that
+changes.
+
+    python predictions.py     # score the dataset with the current model
+"""
+import os
+
+import joblib
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import preload
+import scoring
+import store
+
+STORE_DIR = '.cache/predictions'
+CHUNK_SIZE = 100_000
+
+
+def store_path(checksum):
+    return store.path(STORE_DIR, checksum, '.parquet')
+
+
+def _read_store(path, expected_data_version):
+    if not os.path.exists(path):
+        return None
+    table = pq.read_table(path)
+    if table.schema.metadata.get(b'data_version', b'').decode() != expected_data_version:
+        return None
+    return table['proba'].to_numpy()
+
+
+def score(model, df):
+    """Probability of heart attack for every row, scored in chunks."""
+    proba = np.empty(len(df), dtype=np.float32)
+    for start in range(0, len(df), CHUNK_SIZE):
+        chunk = df.iloc[start:start + CHUNK_SIZE][scoring.INPUT_COLUMNS]
+        proba[start:start + CHUNK_SIZE] = model.predict_proba(chunk)[:, 1]
+    return proba
+
+
+def load_predictions(model, df, checksum, data_version):
+    """Return the stored scores for (model checksum, dataset), scoring and
+    storing them first if needed. Row i is the score of df row i.
+
+    `data_version` is preload.data_version() taken before `df` was read, so
+    scores of an older copy are never stored under a newer version."""
+    def write(proba, path):
+        table = pa.table({'proba': proba}, metadata={'model_sha256': checksum, 'data_version': data_version})
+        pq.write_table(table, path)
+    return store.load(STORE_DIR, checksum, '.parquet', lambda path: _read_store(path, data_version),
+                      lambda: score(model, df), write)
+
+
+if __name__ == '__main__':
+    checksum = preload.model_version()
+    version = preload.data_version()
+    proba = load_predictions(joblib.load(preload.MODEL_PATH), preload.read_data(), checksum, version)
+    print(f"{store_path(checksum)}: {len(proba)} scores, mean {proba.mean():.4f}")
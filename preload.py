@@ -0,0 +1,60 @@
+import functools
+import gc
+import hashlib
+import os
+
+import joblib
+import pandas as pd
+
+MODEL_PATH = 'model/pipeline_logreg_final.joblib'
+DATA_PATH = 'data/df.csv'
+
+# Filled in by launcher.py before it forks the Streamlit workers. The app's
+# load_model()/load_data() return these when set, so every worker reads the
+# same copy-on-write pages instead of loading its own.
+MODEL = None
+MODEL_VERSION = None
+DATA = None
+DATA_VERSION = None
+
+
+def model_version(model_path=MODEL_PATH):
+    """Content hash (sha256) of the artifact currently on disk."""
+    stat = os.stat(model_path)
+    return _checksum(model_path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _checksum(path, mtime_ns, size):
+    # Only rehashed when the file's modification time or size changes
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def data_version(data_path=DATA_PATH):
+    """Changes whenever the dataset file is replaced or appended to."""
+    stat = os.stat(data_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def read_data(file_path=DATA_PATH):
+    df = pd.read_csv(file_path)
+    # Categorical columns store their values once and keep the per-row codes in
+    # a plain numpy array, which forked workers can share without touching
+    for col in df.select_dtypes(include='object').columns:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def preload(model_path=MODEL_PATH, data_path=DATA_PATH):
+    global MODEL, MODEL_VERSION, DATA, DATA_VERSION
+    MODEL_VERSION = model_version(model_path)
+    MODEL = joblib.load(model_path)
+    if os.path.exists(data_path):
+        # Taken before reading, so a file replaced meanwhile shows up as a change
+        DATA_VERSION = data_version(data_path)
+        DATA = read_data(data_path)
+    # Move everything loaded so far out of the collector's generations so the
+    # garbage collector does not write to (and un-share) these pages after fork
+    gc.collect()
+    gc.freeze()
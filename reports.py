@@ -0,0 +1,201 @@
+"""Printable PDF summaries of an assessment.
+
+A report is rendered with matplotlib in a small worker pool, off the thread
+running the page, and stored as .cache/reports/<key>.pdf, where the key
+hashes the model version and the answers in INPUT_COLUMNS order. The
+result only depends on those two, so a repeated profile is served from disk
+by every process. The page submits a report and polls for it. At most
+MAX_PENDING reports queue or render per process; past that, submit() raises
+admission.Busy and the page tries again on its next poll, so a burst of
+assessments cannot build an unbounded backlog.
+
+    python reports.py     # render a sample report and time cold vs cached
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from matplotlib.figure import Figure
+
+import admission
+import scoring
+
+REPORT_DIR = '.cache/reports'
+# Oldest reports beyond this are removed when a new one is written
+MAX_REPORTS = 10_000
+FILE_NAME = 'heart_attack_assessment.pdf'
+# Reports queued or rendering per process; a render takes about half a second of CPU
+MAX_PENDING = 4
+RETRY_AFTER_S = 1.0
+
+# Question wording used in the report, as on the assessment page
+QUESTION_LABELS = {
+    'sex': 'Sex',
+    'race_ethnicity_category': 'Race / ethnicity',
+    'age_category': 'Age',
+    'bmi_category': 'BMI category',
+    'alcohol_drinkers': 'Alcohol in past 30 days',
+    'general_health': 'General health',
+    'smoker_status': 'Smoking status',
+    'physical_activities': 'Physical activity in past 30 days',
+    'had_angina': 'Angina diagnosis',
+    'had_stroke': 'Stroke history',
+    'had_copd': 'COPD diagnosis',
+    'had_diabetes': 'Diabetes diagnosis',
+    'had_kidney_disease': 'Kidney disease diagnosis',
+    'had_depressive_disorder': 'Depressive disorder diagnosis',
+    'had_arthritis': 'Arthritis diagnosis',
+    'deaf_or_hard_of_hearing': 'Hearing difficulty',
+    'blind_or_vision_difficulty': 'Vision difficulty',
+    'difficulty_walking': 'Walking or climbing stairs difficulty',
+    'difficulty_dressing_bathing': 'Dressing or bathing difficulty',
+}
+
+RECOMMENDATIONS = {
+    True: [
+        "Consult a healthcare professional promptly for further evaluation.",
+        "Bring this report to the appointment.",
+        "Cross-check the result with the AHA PREVENT and ACC ASCVD calculators.",
+    ],
+    False: [
+        "Keep up a healthy lifestyle: regular activity, no smoking, balanced diet.",
+        "Repeat the assessment if your health or habits change.",
+        "Cross-check the result with the AHA PREVENT and ACC ASCVD calculators.",
+    ],
+}
+
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='report')
+_lock = threading.Lock()
+# Reports being rendered by this process, plus failed ones so the error
+# reaches the page
+_jobs = {}
+
+
+def report_key(answers, model_version):
+    """Cache key for a dict of column -> answer under a model version."""
+    normalized = [model_version] + [str(answers[col]) for col in scoring.INPUT_COLUMNS]
+    return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+
+def report_path(key):
+    return os.path.join(REPORT_DIR, f"{key}.pdf")
+
+
+def render(answers, proba, threshold, model_version):
+    """PDF bytes of one assessment on an A4 page."""
+    high_risk = proba >= threshold
+    fig = Figure(figsize=(8.27, 11.69))
+    fig.text(0.08, 0.94, "Heart Attack Risk Assessment", fontsize=20, weight='bold')
+    fig.text(0.08, 0.915, f"Generated {time.strftime('%Y-%m-%d')} - model {model_version[:12]}",
+             fontsize=9, color='#666')
+
+    color = '#d62728' if high_risk else '#2ca02c'
+    fig.text(0.08, 0.86, "HIGH RISK" if high_risk else "LOW RISK", fontsize=18, weight='bold', color=color,
+             bbox={'boxstyle': 'round,pad=0.4', 'facecolor': 'white', 'edgecolor': color})
+    fig.text(0.35, 0.865, f"Risk score {proba:.2f} (high risk at {threshold:.2f} or above)", fontsize=11)
+
+    fig.text(0.08, 0.80, "Your answers", fontsize=13, weight='bold')
+    ax = fig.add_axes([0.08, 0.36, 0.84, 0.43])
+    ax.axis('off')
+    table = ax.table(cellText=[[QUESTION_LABELS[col], str(answers[col])] for col in scoring.INPUT_COLUMNS],
+                     colLabels=["Question", "Answer"], colWidths=[0.6, 0.4], loc='upper left', cellLoc='left')
+    table.auto_set_font_size(False)
+    table.set_fontsize(9)
+    table.scale(1, 1.3)
+
+    fig.text(0.08, 0.31, "Recommendations", fontsize=13, weight='bold')
+    for i, line in enumerate(RECOMMENDATIONS[bool(high_risk)]):
+        fig.text(0.10, 0.28 - i * 0.025, f"• {line}", fontsize=10)
+
+    fig.text(0.08, 0.08, "This assessment is a screening aid based on survey answers, not a diagnosis. "
+             "About 80% of people at high risk\nare flagged, and some people at low risk are flagged too.",
+             fontsize=8, color='#666')
+
+    buffer = io.BytesIO()
+    # No creation timestamp in the metadata, so re-rendering gives the same bytes on the same day
+    fig.savefig(buffer, format='pdf', metadata={'Title': "Heart Attack Risk Assessment", 'CreationDate': None})
+    return buffer.getvalue()
+
+
+def _prune():
+    names = [name for name in os.listdir(REPORT_DIR) if name.endswith('.pdf')]
+    if len(names) <= MAX_REPORTS:
+        return
+    paths = sorted((os.path.join(REPORT_DIR, name) for name in names), key=os.path.getmtime)
+    for path in paths[:len(paths) - MAX_REPORTS]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _build(key, answers, proba, threshold, model_version):
+    pdf = render(answers, proba, threshold, model_version)
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = report_path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf)
+    os.replace(tmp_path, path)
+    _prune()
+
+
+def _finished(key):
+    def forget(future):
+        if future.exception() is None:
+            with _lock:
+                _jobs.pop(key, None)
+    return forget
+
+
+def submit(answers, proba, threshold, model_version):
+    """Start rendering the report unless it is cached or already rendering.
+    Returns its key for result(). Raises admission.Busy if MAX_PENDING reports
+    are already queued or rendering."""
+    key = report_key(answers, model_version)
+    if os.path.exists(report_path(key)):
+        return key
+    with _lock:
+        job = _jobs.get(key)
+        # A failed render is retried on the next submit
+        if job is None or (job.done() and job.exception() is not None):
+            if sum(not pending.done() for pending in _jobs.values()) >= MAX_PENDING:
+                raise admission.Busy('report', RETRY_AFTER_S)
+            _jobs[key] = _pool.submit(_build, key, dict(answers), float(proba), float(threshold), model_version)
+            _jobs[key].add_done_callback(_finished(key))
+    return key
+
+
+def result(key):
+    """PDF bytes once the report is ready, else None. Re-raises a rendering error."""
+    with _lock:
+        future = _jobs.get(key)
+    if future is not None and future.done() and future.exception() is not None:
+        raise future.exception()
+    try:
+        with open(report_path(key), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+if __name__ == '__main__':
+    import joblib
+    import pandas as pd
+
+    import preload
+
+    model = joblib.load(preload.MODEL_PATH)
+    answers = {col: cats[0] for col, cats in zip(scoring.INPUT_COLUMNS, model.named_steps['encoding'].categories_)}
+    proba, threshold = scoring.predict(model, pd.DataFrame([answers], columns=scoring.INPUT_COLUMNS))
+    version = preload.model_version()
+    for label in ('cold', 'cached'):
+        start = time.perf_counter()
+        key = submit(answers, proba, threshold, version)
+        while (pdf := result(key)) is None:
+            time.sleep(0.005)
+        print(f"{label:<7} {(time.perf_counter() - start) * 1000:8.1f} ms  {len(pdf):,} bytes  {report_path(key)}")
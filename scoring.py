@@ -0,0 +1,54 @@
+import numpy as np
+
+# Column order expected by the model pipeline
+INPUT_COLUMNS = [
+    'sex', 'race_ethnicity_category', 'age_category', 'bmi_category',
+    'alcohol_drinkers', 'general_health', 'smoker_status',
+    'physical_activities', 'had_angina', 'had_stroke', 'had_copd',
+    'had_diabetes', 'had_kidney_disease', 'had_depressive_disorder',
+    'had_arthritis', 'deaf_or_hard_of_hearing',
+    'blind_or_vision_difficulty', 'difficulty_walking',
+    'difficulty_dressing_bathing'
+]
+
+# Heart attack label column in data/df.csv
+TARGET = 'had_heart_attack'
+# Values of TARGET that mean the respondent had a heart attack
+POSITIVE_LABELS = ['Yes', '1', 'True']
+
+
+def predict(model, input_df):
+    """Return (probability of heart attack, decision threshold) for one row."""
+    threshold = model.named_steps['logreg'].threshold
+    proba = model.predict_proba(input_df)[0][1]
+    return proba, threshold
+
+
+def build_lookup(model):
+    """Precompute the log-odds contribution of every answer.
+
+    The pipeline is one-hot encoding -> standard scaling -> logistic
+    regression, so the log-odds of a profile is a constant plus one term per
+    answered question. Scoring from this table needs no pandas or sklearn
+    call and gives the same probability as predict_proba. Returns None for
+    pipelines of any other shape.
+    """
+    steps = model.named_steps
+    if list(steps) != ['encoding', 'scaler', 'logreg']:
+        return None
+    encoder, scaler, logreg = steps['encoding'], steps['scaler'], steps['logreg']
+    weights = logreg.coef_[0] / scaler.scale_
+    intercept = logreg.intercept_[0] - np.dot(weights, scaler.mean_)
+
+    contributions = {}
+    offset = 0
+    for col, categories in zip(encoder.feature_names_in_, encoder.categories_):
+        contributions[col] = dict(zip(categories, weights[offset:offset + len(categories)]))
+        offset += len(categories)
+    return {'intercept': intercept, 'contributions': contributions, 'threshold': logreg.threshold}
+
+
+def lookup_proba(table, answers):
+    """Probability for a dict of column -> answer using a build_lookup table."""
+    logit = table['intercept'] + sum(table['contributions'][col][answers[col]] for col in INPUT_COLUMNS)
+    return 1.0 / (1.0 + np.exp(-logit))
@@ -0,0 +1,259 @@
+"""Score assessments with candidate models alongside the shipped one.
+
+Every *.joblib under model/shadow/ is a shadow model; one that fails to
+load is logged and skipped. Each assessment is submitted to a thread pool
+for the primary model and every shadow at once. The page waits for the
+primary result only, for at most LATENCY_BUDGET_S; past that it gets
+admission.Busy and uses the same degraded path as an overloaded predict
+gate. A primary score still queued when the budget runs out is cancelled,
+so an overload cannot build a backlog behind the gate. While shadows are
+loaded, every score (shadow, primary and late primary) is appended to
+.cache/shadow/scores.jsonl from the pool threads when it finishes, so
+shadows never add to the response time. The log is rotated to
+scores.jsonl.1 at MAX_LOG_BYTES.
+
+    python shadow.py --build-examples    # fit example shadows into model/shadow/
+    python shadow.py --report            # agreement and latency per model
+"""
+import argparse
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import joblib
+import pandas as pd
+
+import admission
+import preload
+
+SHADOW_DIR = 'model/shadow'
+LOG_PATH = '.cache/shadow/scores.jsonl'
+LATENCY_BUDGET_S = 0.25
+MAX_LOG_BYTES = 50 * 1024 * 1024
+PRIMARY = 'primary'
+
+logger = logging.getLogger(__name__)
+
+_CORES = os.cpu_count() or 1
+# A request is only shadowed while fewer than this many shadow scores are
+# queued or running and the primary pool has idle workers, so shadows use
+# spare capacity and cannot build a backlog
+MAX_SHADOW_PENDING = _CORES
+
+# Separate pools so the primary never queues behind shadow work
+_primary_pool = ThreadPoolExecutor(max_workers=_CORES, thread_name_prefix='primary')
+_shadow_pool = ThreadPoolExecutor(max_workers=max(1, _CORES // 2), thread_name_prefix='shadow')
+_pending_lock = threading.Lock()
+_shadow_pending = 0
+_primary_running = 0
+
+
+def discover(shadow_dir=SHADOW_DIR):
+    """{name: path} of the shadow artifacts, by file name without extension."""
+    if not os.path.isdir(shadow_dir):
+        return {}
+    return {name[:-len('.joblib')]: os.path.join(shadow_dir, name)
+            for name in sorted(os.listdir(shadow_dir)) if name.endswith('.joblib')}
+
+
+def versions(shadow_dir=SHADOW_DIR):
+    """Hashable (name, sha256) per shadow artifact; changes when one is added,
+    removed or replaced."""
+    found = []
+    for name, path in discover(shadow_dir).items():
+        try:
+            found.append((name, preload.model_version(path)))
+        except FileNotFoundError:
+            # Removed since it was listed
+            pass
+    return tuple(found)
+
+
+def load_models(shadow_dir=SHADOW_DIR):
+    """{name: model} of the shadow artifacts that load. An unreadable artifact
+    is logged and skipped, so it can never affect the primary score."""
+    models = {}
+    for name, path in discover(shadow_dir).items():
+        try:
+            models[name] = joblib.load(path)
+        except Exception:
+            logger.exception("Skipping shadow model %s: could not load %s", name, path)
+    return models
+
+
+def threshold(model):
+    """Decision threshold of a pipeline: the `threshold` set by train.py on
+    its last step, or 0.5 for artifacts trained elsewhere."""
+    return getattr(model.steps[-1][1], 'threshold', 0.5)
+
+
+def _score(model, input_df):
+    start = time.perf_counter()
+    proba = float(model.predict_proba(input_df)[0][1])
+    return proba, (time.perf_counter() - start) * 1000
+
+
+def _append(records, log_path=LOG_PATH):
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    lines = ''.join(json.dumps(record) + '\n' for record in records)
+    while True:
+        with open(log_path, 'a') as f:
+            # Workers forked by launcher.py share the log file
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                current = os.stat(log_path).st_ino
+            except FileNotFoundError:
+                continue
+            if os.fstat(f.fileno()).st_ino != current:
+                # Another writer rotated the log while we waited for the lock
+                continue
+            if os.fstat(f.fileno()).st_size < MAX_LOG_BYTES:
+                f.write(lines)
+                return
+            os.replace(log_path, log_path + '.1')
+
+
+def _recorder(request, name, model, log_path, log):
+    def record(future):
+        global _shadow_pending, _primary_running
+        with _pending_lock:
+            if name == PRIMARY:
+                _primary_running -= 1
+            else:
+                _shadow_pending -= 1
+        if not log or future.cancelled():
+            return
+        entry = {'request': request, 'time': time.time(), 'model': name}
+        try:
+            proba, latency_ms = future.result()
+            entry.update(proba=proba, flagged=bool(proba >= threshold(model)), latency_ms=latency_ms)
+        except Exception as e:
+            entry['error'] = repr(e)
+        try:
+            _append([entry], log_path)
+        except OSError:
+            pass
+    return record
+
+
+def predict(primary, shadows, input_df, budget_s=LATENCY_BUDGET_S, log_path=LOG_PATH):
+    """scoring.predict for the primary model, with every shadow scored on the
+    same input in the background. Raises admission.Busy if the primary does
+    not finish within `budget_s`."""
+    global _shadow_pending, _primary_running
+    request = uuid.uuid4().hex
+    with _pending_lock:
+        _primary_running += 1
+    future = _primary_pool.submit(_score, primary, input_df)
+    # The primary is only logged as the reference for shadows
+    future.add_done_callback(_recorder(request, PRIMARY, primary, log_path, log=bool(shadows)))
+
+    # All shadows or none, so every candidate is compared on the same requests
+    with _pending_lock:
+        admitted = (_primary_running <= _CORES
+                    and _shadow_pending + len(shadows) <= max(MAX_SHADOW_PENDING, len(shadows)))
+        if admitted:
+            _shadow_pending += len(shadows)
+    for name, model in shadows.items() if admitted else ():
+        _shadow_pool.submit(_score, model, input_df).add_done_callback(
+            _recorder(request, name, model, log_path, log=True))
+
+    try:
+        proba, _ = future.result(timeout=budget_s)
+    except TimeoutError:
+        # Drop it if no worker has picked it up yet; nobody will read the result
+        future.cancel()
+        raise admission.Busy(PRIMARY, budget_s) from None
+    return proba, threshold(primary)
+
+
+def report(log_path=LOG_PATH):
+    """Per model: requests scored, agreement of the High/Low Risk decision
+    with the primary, mean absolute probability difference and latency."""
+    # Include the rotated log, if any, so the report spans both files
+    paths = [path for path in (log_path + '.1', log_path) if os.path.exists(path)]
+    records = pd.concat([pd.read_json(path, lines=True) for path in paths], ignore_index=True)
+    if 'error' not in records:
+        records['error'] = None
+    scored = records[records['error'].isna()]
+    primary = scored[scored['model'] == PRIMARY].set_index('request')[['proba', 'flagged']]
+    rows = []
+    for name, group in scored.groupby('model', sort=False):
+        paired = group.join(primary, on='request', rsuffix='_primary', how='inner')
+        rows.append({
+            'model': name,
+            'requests': len(group),
+            'errors': int((records['model'] == name).sum() - len(group)),
+            'flag_rate': group['flagged'].mean(),
+            'agreement': (paired['flagged'] == paired['flagged_primary']).mean(),
+            'mean_abs_diff': (paired['proba'] - paired['proba_primary']).abs().mean(),
+            'p50_ms': group['latency_ms'].quantile(0.50),
+            'p99_ms': group['latency_ms'].quantile(0.99),
+        })
+    table = pd.DataFrame(rows)
+    # Primary first, then candidates by agreement
+    return pd.concat([table[table['model'] == PRIMARY],
+                      table[table['model'] != PRIMARY].sort_values('agreement', ascending=False)],
+                     ignore_index=True)
+
+
+def build_examples(shadow_dir=SHADOW_DIR, data_path=preload.DATA_PATH):
+    """Fit a calibrated logistic regression and a gradient boosting model on
+    train.py's training split, with thresholds for the same recall target."""
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import cross_val_predict
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    import train
+
+    X, y = train.load_training_data(data_path)
+    X_train, _, y_train, _ = train.split(X, y)
+    candidates = {
+        'calibrated_logreg': Pipeline([
+            ('encoding', OneHotEncoder(handle_unknown='ignore', sparse_output=False)),
+            ('scaler', StandardScaler()),
+            ('model', CalibratedClassifierCV(LogisticRegression(max_iter=1000), method='isotonic', cv=3)),
+        ]),
+        'gradient_boosting': Pipeline([
+            ('encoding', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1)),
+            ('model', HistGradientBoostingClassifier(categorical_features=list(range(len(X.columns))),
+                                                     random_state=train.RANDOM_STATE)),
+        ]),
+    }
+    os.makedirs(shadow_dir, exist_ok=True)
+    for name, pipeline in candidates.items():
+        oof_proba = cross_val_predict(pipeline, X_train, y_train, cv=3, method='predict_proba')[:, 1]
+        pipeline.fit(X_train, y_train)
+        pipeline.steps[-1][1].threshold = train.choose_threshold(y_train, oof_proba)
+        # Write then rename so the app never loads a half-written shadow
+        path = os.path.join(shadow_dir, f"{name}.joblib")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(pipeline, tmp_path)
+        os.replace(tmp_path, path)
+        print(f"Wrote {name} (threshold {pipeline.steps[-1][1].threshold:.4f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--build-examples', action='store_true')
+    parser.add_argument('--report', action='store_true')
+    parser.add_argument('--log', default=LOG_PATH)
+    args = parser.parse_args()
+    if args.build_examples:
+        build_examples()
+    if args.report:
+        if not os.path.exists(args.log):
+            parser.exit(1, f"error: no shadow scores at {args.log}\n")
+        print(report(args.log).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Results stored per model artifact under .cache/, shared by every process.
+
+A store directory holds one file per model checksum. The first process to
+need a missing or stale result computes it while holding <dir>/.lock; the
+others wait on the lock and then read what it wrote. The file is written to
+a temporary name and moved into place, so readers never see a partial one,
+and files for other checksums are removed once the new one is in place.
+"""
+import fcntl
+import os
+import threading
+
+
+def path(store_dir, checksum, extension):
+    return os.path.join(store_dir, f"{checksum}{extension}")
+
+
+def load(store_dir, checksum, extension, read, build, write):
+    """The stored result for `checksum`, computing and storing it first if needed.
+
+    `read(path)` returns the stored result, or None if the file is missing or
+    stale; `build()` computes it and `write(result, path)` saves it."""
+    target = path(store_dir, checksum, extension)
+    result = read(target)
+    if result is not None:
+        return result
+
+    os.makedirs(store_dir, exist_ok=True)
+    # Only one process computes a given model; the others wait and then read
+    with open(os.path.join(store_dir, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        result = read(target)
+        if result is not None:
+            return result
+
+        result = build()
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            write(result, tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        for name in os.listdir(store_dir):
+            if name.endswith(extension) and name != os.path.basename(target):
+                os.remove(os.path.join(store_dir, name))
+    return result
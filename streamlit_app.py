@@ -1,9 +1,23 @@
 import streamlit as st
 import joblib  
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import time
+import admission
+import approx
+import assets
+import cohort
+import importance
+import ingest
+import predictions
+import preload
+import reports
+import scoring
+import shadow
+import uncertainty
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from imblearn.pipeline import Pipeline
 
@@ -52,6 +66,7 @@ with st.sidebar:
         '📝 Heart Attack Assessment': 'predict',
         '🧮 Additional Tools': 'calculators', 
         '📊 Data Insights': 'eda',  # Renamed and rearranged
+        '🔎 Cohort Builder': 'cohort',
         '🤖 ML Model': 'ml',
         '📧 Contact': 'contact'
     }
@@ -63,12 +78,20 @@ with st.sidebar:
             st.rerun()
                         
 # Load Model (keep your original model loading code)
-@st.cache_resource
-def load_model():
-    model_path = 'model/pipeline_logreg_final.joblib'
-    if not os.path.exists(model_path):
-        st.error(f"Model file does not exist at {model_path}.")
-        st.stop()
+model_path = preload.MODEL_PATH
+if not os.path.exists(model_path):
+    st.error(f"Model file does not exist at {model_path}.")
+    st.stop()
+# Changes whenever a new artifact is published (see online.py), so the next
+# rerun loads it without restarting the app
+model_version = preload.model_version(model_path)
+
+
+@st.cache_resource(max_entries=1)
+def load_model(model_version):
+    # Model already loaded by launcher.py in the parent process
+    if preload.MODEL is not None and preload.MODEL_VERSION == model_version:
+        return preload.MODEL
     try:
         model = joblib.load(model_path)
         return model
@@ -76,10 +99,133 @@ def load_model():
         st.error(f"Failed to load model due to a missing module: {str(e)}")
         st.stop()
     
-model = load_model()
+model = load_model(model_version)
+
+
+# Candidate models scored next to the primary one (see shadow.py); reloaded
+# when an artifact in model/shadow/ is added, removed or replaced
+@st.cache_resource(max_entries=1)
+def load_shadow_models(shadow_versions):
+    return shadow.load_models()
+
+
+def current_shadows():
+    # Shadows must never affect the primary result, so any problem listing or
+    # loading them just means no shadows for this request
+    try:
+        return load_shadow_models(shadow.versions())
+    except Exception:
+        shadow.logger.exception("Scoring without shadow models")
+        return {}
+
+
+# Bootstrap replicates of the model stacked into one weight matrix (see
+# uncertainty.py); None until an ensemble is fitted for this artifact, and
+# reloaded when the ensemble file is written or replaced
+@st.cache_resource(max_entries=1)
+def load_ensemble(_model, model_version, ensemble_version):
+    return uncertainty.load(_model, model_version)
+
+
+# Precomputed per-answer scores used when the predict gate is saturated
+@st.cache_resource(max_entries=1)
+def load_lookup(_model, model_version):
+    return scoring.build_lookup(_model)
+
+
+# Load data with caching and error handling. cache_resource keeps one shared
+# read-only copy per process instead of unpickling a copy on every rerun; it is
+# reloaded when data/df.csv is replaced.
+@st.cache_resource(max_entries=1)
+def load_data(data_version):
+    if preload.DATA is not None and preload.DATA_VERSION == data_version:
+        return preload.DATA
+    file_path = preload.DATA_PATH  # Ensure this path is correct
+    try:
+        df = preload.read_data(file_path)
+        return df
+    except FileNotFoundError:
+        st.error(f"Error: File not found at {file_path}")
+        return None
+    except Exception as e:
+        st.error(f"Error loading data: {str(e)}")
+        return None
         
 
 
+# Per-answer counts and stratified sample for EDA, merged over data/df.csv and
+# every ingested wave (see ingest.py); reloaded when a partition is added
+@st.cache_resource(max_entries=1)
+def load_eda_summary(data_version):
+    # Only a cache miss reads the dataset, so only a miss waits for the gate
+    # and may raise admission.Busy (exceptions are not cached)
+    with admission.DATA_GATE.admit():
+        return ingest.load_summary()
+
+
+# Model scores for every respondent, materialized once per model checksum
+# and dataset version and shared across processes (see predictions.py)
+@st.cache_resource(max_entries=1)
+def load_scores(_model, model_version, data_version):
+    with admission.DATA_GATE.admit():
+        return predictions.load_predictions(_model, load_data(data_version), model_version, data_version)
+
+
+# Per-question importance of the current model, computed once per model
+# checksum and dataset version and shared across processes (see importance.py)
+@st.cache_resource(max_entries=1)
+def load_importance(_model, model_version, data_version):
+    with admission.DATA_GATE.admit():
+        return importance.load_importance(_model, model_version)
+
+
+
+# Printable report for an assessment (see reports.py). While it is rendering,
+# only the report_poll fragment reruns, so the page is never blocked. Once the
+# report is ready (or failed) the outcome is kept in session state and the app
+# reruns without the fragment, which ends the polling.
+def report_outcome(answers, proba, threshold, model_version, resubmit):
+    """PDF bytes, None while queued or rendering, or the rendering error.
+    A failed render is only retried with `resubmit`."""
+    key = reports.report_key(answers, model_version)
+    try:
+        pdf = None if resubmit else reports.result(key)
+        if pdf is None:
+            pdf = reports.result(reports.submit(answers, proba, threshold, model_version))
+    except admission.Busy:
+        # Too many reports rendering in this process; submitted again on the next poll
+        return None
+    except Exception as e:
+        return e
+    return pdf
+
+
+def report_download(answers, proba, threshold, model_version):
+    key = reports.report_key(answers, model_version)
+    finished = st.session_state.get('report_finished')
+    if finished is not None and finished[0] == key:
+        outcome = finished[1]
+    else:
+        outcome = report_outcome(answers, proba, threshold, model_version, resubmit=True)
+    if outcome is None:
+        report_poll(answers, proba, threshold, model_version)
+    elif isinstance(outcome, Exception):
+        st.error(f"Could not create the printable report: {str(outcome)}")
+    else:
+        st.download_button("📄 Download printable report (PDF)", outcome, file_name=reports.FILE_NAME,
+                           mime='application/pdf', on_click='ignore', key=f"report_{key}")
+
+
+@st.fragment(run_every=1.0)
+def report_poll(answers, proba, threshold, model_version):
+    outcome = report_outcome(answers, proba, threshold, model_version, resubmit=False)
+    if outcome is None:
+        st.caption("📄 Preparing your printable report...")
+        return
+    st.session_state.report_finished = (reports.report_key(answers, model_version), outcome)
+    st.session_state.report_rerun = True
+    st.rerun()
+
 
 # Welcome Page
 if st.session_state.page == 'welcome':
@@ -277,15 +423,7 @@ elif st.session_state.page == 'predict':
         difficulty_dressing_bathing
     ]
 
-    input_columns = [
-        'sex', 'race_ethnicity_category', 'age_category', 'bmi_category',
-        'alcohol_drinkers', 'general_health', 'smoker_status',
-        'physical_activities', 'had_angina', 'had_stroke', 'had_copd',
-        'had_diabetes', 'had_kidney_disease', 'had_depressive_disorder',
-        'had_arthritis', 'deaf_or_hard_of_hearing',
-        'blind_or_vision_difficulty', 'difficulty_walking',
-        'difficulty_dressing_bathing'
-    ]
+    input_columns = scoring.INPUT_COLUMNS
 
     input_df = pd.DataFrame([input_data], columns=input_columns)
 
@@ -308,9 +446,36 @@ elif st.session_state.page == 'predict':
                     use_container_width=True,
                     help="Analyze your risk factors",
                     type="primary"):
+            st.session_state.predict_pending = True
+            st.session_state.pop('report_finished', None)
+
+        answers = dict(zip(input_columns, input_data))
+        # Rerun started by report_poll: show the same result again without rescoring it
+        assessment = st.session_state.get('assessment')
+        reshow = (st.session_state.pop('report_rerun', False) and assessment is not None
+                  and assessment[0] == answers)
+        # Kept in session state so a "busy, retrying" rerun still predicts
+        if st.session_state.get('predict_pending') or reshow:
             try:
-                threshold = model.named_steps['logreg'].threshold
-                proba = model.predict_proba(input_df)[0][1]
+                if reshow:
+                    _, proba, threshold = assessment
+                else:
+                    shadows = current_shadows()
+                    try:
+                        with admission.PREDICT_GATE.admit():
+                            proba, threshold = shadow.predict(model, shadows, input_df)
+                    except admission.Busy as busy:
+                        # Degraded mode (gate full or primary over its latency budget):
+                        # score from the precomputed answer table
+                        lookup = load_lookup(model, model_version)
+                        if lookup is None:
+                            st.warning(f"⏳ The server is busy, retrying in {busy.retry_after:.1f}s...")
+                            time.sleep(busy.retry_after)
+                            st.rerun()
+                        proba = scoring.lookup_proba(lookup, answers)
+                        threshold = lookup['threshold']
+                    st.session_state.assessment = (answers, proba, threshold)
+                st.session_state.predict_pending = False
                 prediction = 'High Risk' if proba >= threshold else 'Low Risk'
                 
                 st.subheader('Results')
@@ -322,7 +487,18 @@ elif st.session_state.page == 'predict':
                     st.success("""✅ **Good News** ✅  
                             Our analysis shows **LOW RISK** of heart attack.  
                             Keep up the good work and maintain a healthy lifestyle!""")
+
+                # How close the call was, across bootstrap refits of the model
+                ensemble = load_ensemble(model, model_version, uncertainty.version())
+                if ensemble is not None:
+                    low, high, share_high = uncertainty.interval(ensemble, answers, proba, threshold)
+                    agree = share_high if prediction == 'High Risk' else 1 - share_high
+                    st.markdown(f"**Risk score:** {proba:.2f} (high risk at {threshold:.2f} or above)  \n"
+                                f"**{uncertainty.INTERVAL:.0%} interval:** {low:.2f} – {high:.2f}, "
+                                f"{agree:.0%} of {len(ensemble['intercepts'])} bootstrap models give the same result")
                     
+                report_download(answers, proba, threshold, model_version)
+
                 st.markdown("---")
                 st.info("💡 **Recommendation:** Validate results using 🧮 Additional Tools")
         
@@ -436,30 +612,13 @@ elif st.session_state.page == 'eda':
 
     
 
-    # Load data with caching and error handling
-    @st.cache_data
-    def load_data():
-        file_path = 'data/df.csv'  # Ensure this path is correct
-        try:
-            df = pd.read_csv(file_path)
-            return df
-        except FileNotFoundError:
-            st.error(f"Error: File not found at {file_path}")
-            return None
-        except Exception as e:
-            st.error(f"Error loading data: {str(e)}")
-            return None
-    
-    df = load_data()
-    
-
     # Add some space
     st.markdown("<br>", unsafe_allow_html=True)  # Two line breaks
 
     # First Plot
     st.markdown("#### Heart Attack Occurrence Distribution")
     try:
-        st.image("src/Heart_Attack_Occurrence_Distribution.png", 
+        assets.image("src/Heart_Attack_Occurrence_Distribution.png", 
                  width=600)
     except FileNotFoundError:
         st.error("Heart attack distribution image not found at src/Heart_Attack_Occurrence_Distribution.png")  # Fixed error message
@@ -488,7 +647,7 @@ elif st.session_state.page == 'eda':
     # Second image Age group
     st.markdown("#### Heart Attack Likelihood By Age")
     try:
-        st.image("src/heart_attack_age_group.png", 
+        assets.image("src/heart_attack_age_group.png", 
                  width=1000)
     except FileNotFoundError:
         st.error("Age group distribution image not found at src/heart_attack_age_group.png")
@@ -522,7 +681,7 @@ elif st.session_state.page == 'eda':
     # Second image Age group
     st.markdown("#### Heart Attack Likelihood By Gender")
     try:
-        st.image("src/heart_attack_gender.png", 
+        assets.image("src/heart_attack_gender.png", 
                  width=1000)
     except FileNotFoundError:
         st.error("Gender distribution image not found at src/heart_attack_gender.png")
@@ -554,7 +713,7 @@ elif st.session_state.page == 'eda':
     # Third plot
     st.markdown("#### Heart Attack Likelihood By Smoking Status")
     try:
-        st.image("src/heart_attack_smoker_status.png", width=1000)
+        assets.image("src/heart_attack_smoker_status.png", width=1000)
     except FileNotFoundError:
         st.error("Heart attack by smoker status image not found at src/heart_attack_smoker_status.png")
     
@@ -580,7 +739,7 @@ elif st.session_state.page == 'eda':
     # Fourth plot
     st.markdown("#### Heart Attack Likelihood By BMI Category")
     try:
-        st.image("src/heart_attack_bmi_category.png", width=1000)
+        assets.image("src/heart_attack_bmi_category.png", width=1000)
     except FileNotFoundError:
         st.error("Heart attack by BMI category image not found at src/heart_attack_bmi_category.png")
     
@@ -608,7 +767,7 @@ elif st.session_state.page == 'eda':
     # By General Health
     st.markdown("#### Heart Attack Likelihood By General Health Condition")
     try:
-        st.image("src/heart_attack_general_health.png", 
+        assets.image("src/heart_attack_general_health.png", 
                  width=1000)
     except FileNotFoundError:
         st.error("General Health distribution image not found at src/heart_attack_general_health.png")
@@ -642,7 +801,7 @@ elif st.session_state.page == 'eda':
     # Fifth plot
     st.markdown("#### Heart Attack Likelihood By Angina")
     try:
-        st.image("src/heart_attack_had_angina.png", width=1000)
+        assets.image("src/heart_attack_had_angina.png", width=1000)
     except FileNotFoundError:
         st.error("Heart attack by angina image not found at src/heart_attack_had_angina.png")
     
@@ -666,10 +825,92 @@ elif st.session_state.page == 'eda':
     </div>
     """, unsafe_allow_html=True)
 
+    # Interactive rates, estimated from a stratified sample on large extracts
+    if os.path.exists(preload.DATA_PATH):
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("#### Explore Heart Attack Likelihood By Question")
+        question = st.selectbox("Question:", scoring.INPUT_COLUMNS,
+                                format_func=lambda col: col.replace('_', ' ').capitalize(),
+                                key='eda_question')
+        try:
+            aggregates, estimator = load_eda_summary(ingest.version())
+            rates, is_exact = approx.group_rates(estimator, lambda col: ingest.exact_rates(aggregates, col),
+                                                 question)
+        except admission.Busy:
+            rates = None
+            st.info("⏳ The dataset is busy right now, please try this question again in a moment.")
+
+        if rates is not None:
+            fig, ax = plt.subplots(figsize=(8, 0.4 * len(rates) + 1))
+            ax.barh(rates['answer'], rates['rate'] * 100, color='#FF5733',
+                    xerr=None if is_exact else [(rates['rate'] - rates['ci_low']) * 100,
+                                                (rates['ci_high'] - rates['rate']) * 100],
+                    capsize=4)
+            ax.set_xlabel("Heart attack likelihood (%)")
+            ax.invert_yaxis()
+            st.pyplot(fig)
+            plt.close(fig)
+            if is_exact:
+                st.caption("Exact rates over all respondents.")
+            else:
+                st.caption(f"Estimated from a stratified sample of up to {approx.SAMPLE_PER_LABEL:,} respondents "
+                           "per outcome; error bars show 95% confidence intervals.")
+
 
     
 
 
+# Cohort Builder Section
+elif st.session_state.page == 'cohort':
+    st.header("🔎 Cohort Builder")
+    st.markdown("""
+    Build your own group of survey respondents, e.g. obese former smokers over 60 with diabetes, and see how often they reported a heart attack.
+    Leave a question empty to include every answer.
+    """)
+
+    # Reopened when a new wave partition is ingested
+    @st.cache_resource(max_entries=1)
+    def load_cohort_dataset(data_version):
+        try:
+            cohort.ensure_parquet()
+        except FileNotFoundError:
+            st.error(f"Error: File not found at {preload.DATA_PATH}")
+            return None, {}
+        dataset = cohort.open_dataset()
+        return dataset, cohort.categories(dataset)
+
+    # One cached result per distinct (normalized) question/answer selection
+    @st.cache_data(max_entries=1000)
+    def run_cohort_query(filters, data_version):
+        return cohort.query(load_cohort_dataset(data_version)[0], filters)
+
+    data_version = ingest.version()
+    dataset, options = load_cohort_dataset(data_version)
+    if dataset is not None:
+        selections = {}
+        cols = st.columns(3)
+        for i, col in enumerate(scoring.INPUT_COLUMNS):
+            with cols[i % 3]:
+                selections[col] = st.multiselect(col.replace('_', ' ').capitalize(), options[col],
+                                                 key=f'cohort_{col}')
+
+        baseline = run_cohort_query((), data_version)
+        result = run_cohort_query(cohort.normalize(selections), data_version)
+
+        st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Respondents", f"{result['count']:,}")
+        m2.metric("Heart attacks", f"{result['cases']:,}")
+        if result['rate'] is None:
+            m3.metric("Heart attack rate", "–")
+            st.info("No respondents match this cohort.")
+        else:
+            m3.metric("Heart attack rate", f"{result['rate']:.1%}",
+                      delta=f"{(result['rate'] - baseline['rate']) * 100:+.1f} pts vs all respondents",
+                      delta_color="inverse")
+        st.caption(f"Query time: {result['query_ms']:.1f} ms (cached after the first run)")
+
+
 # ML Section
 elif st.session_state.page == 'ml':
     st.header("🤖 Heart Attack Prediction ML Model")
@@ -688,7 +929,7 @@ elif st.session_state.page == 'ml':
     # Project Flowchart
     st.markdown("### End-to-End Project Workflow")
     try:
-        st.image("src/project_flowchart.png", width=800)
+        assets.image("src/project_flowchart.png", width=800)
     except FileNotFoundError:
         st.error("Critical workflow diagram missing: Please ensure 'project_flowchart.png' exists in /src directory")
         st.stop()
@@ -719,7 +960,7 @@ elif st.session_state.page == 'ml':
     # Recall Visualization
     st.markdown("### Recall Performance on Test Data")
     try:
-        st.image("src/recall_scores.png", width=1000)
+        assets.image("src/recall_scores.png", width=1000)
     except FileNotFoundError:
         st.error("Critical visualization missing: Please ensure 'recall_scores.png' exists in /src directory")
         st.stop()  # Halt execution if key visual missing
@@ -752,7 +993,7 @@ elif st.session_state.page == 'ml':
     # Recall Visualization
     st.markdown("### False Positive Rate on Test Data")
     try:
-        st.image("src/false_positive_rate.png", width=1000)
+        assets.image("src/false_positive_rate.png", width=1000)
     except FileNotFoundError:
         st.error("Critical visualization missing: Please ensure 'false_positive_rate.png' exists in /src directory")
         st.stop()  # Halt execution if key visual missing
@@ -787,7 +1028,7 @@ elif st.session_state.page == 'ml':
     # Recall Visualization
     st.markdown("### False Positive Rate on Test Data")
     try:
-        st.image("src/ROC_AUC_curve.png", width=1000)
+        assets.image("src/ROC_AUC_curve.png", width=1000)
     except FileNotFoundError:
         st.error("Critical visualization missing: Please ensure 'ROC_AUC_curve.png' exists in /src directory")
         st.stop()  # Halt execution if key visual missing
@@ -837,7 +1078,7 @@ elif st.session_state.page == 'ml':
     st.markdown("<br>", unsafe_allow_html=True)  
     st.markdown("#### Model Limitations by Age Group")
     try:
-        st.image("src/model_limitations_age_category.png", width=1000)
+        assets.image("src/model_limitations_age_category.png", width=1000)
     except FileNotFoundError:
         st.error("Model limitations image not found at src/model_limitations_age_category.png")
 
@@ -883,7 +1124,7 @@ elif st.session_state.page == 'ml':
        # Model Limitations by Angina History
     st.markdown("#### Model Limitations by Angina History")
     try:
-        st.image("src/model_limitations_had_angina.png", width=1000)
+        assets.image("src/model_limitations_had_angina.png", width=1000)
     except FileNotFoundError:
         st.error("Model limitations image not found at src/model_limitations_had_angina.png")
 
@@ -933,14 +1174,47 @@ elif st.session_state.page == 'ml':
     st.markdown("<br>", unsafe_allow_html=True)  
     
 
-    # Model coefficients interpretations
+    # Model coefficients interpretations, computed from the current model
     st.markdown("### Model Feature Interpretation")
+    data_version = preload.data_version() if os.path.exists(preload.DATA_PATH) else None
     try:
-        st.image("src/model_coefficients.png", 
-                 width=1000)
-    except FileNotFoundError:
-        st.error("Critical interpretation missing: Please ensure 'model_coefficients.png' exists in /src directory")
-        st.stop()
+        with st.spinner("Computing feature importance for this model..."):
+            stored = load_importance(model, model_version, data_version)
+    except admission.Busy:
+        # Coefficients come from the model alone; only permutation importance needs the dataset
+        stored = {'permutation': None, 'coefficients': importance.coefficients(model)}
+        st.info("⏳ The dataset is busy right now, showing the coefficient swing only.")
+    measures = {}
+    if stored['permutation']:
+        measures["Permutation importance (test AUC drop)"] = 'auc_drop'
+    if stored['coefficients']:
+        measures["Coefficient swing (odds ratio, highest vs lowest risk answer)"] = 'odds_ratio_swing'
+
+    if measures:
+        by_question = importance.question_table(stored)
+        measure = st.radio("Rank questions by", list(measures), horizontal=True)
+        st.bar_chart(by_question, x='question', y=measures[measure], horizontal=True,
+                     sort=f"-{measures[measure]}", x_label="", y_label=measure)
+        if stored['permutation']:
+            st.caption(f"Permutation importance: mean drop in ROC AUC over {importance.N_REPEATS} shuffles "
+                       f"of each question on {stored['permutation']['rows']:,} held-out respondents.")
+
+        if stored['coefficients']:
+            answers = pd.DataFrame(stored['coefficients']['answers'])
+            answers['odds_ratio'] = np.exp(answers['log_odds'])
+            question = st.selectbox("Odds ratio of each answer", scoring.INPUT_COLUMNS,
+                                    index=scoring.INPUT_COLUMNS.index('had_angina'),
+                                    key='importance_question')
+            st.bar_chart(answers[answers['question'] == question], x='answer', y='odds_ratio',
+                         horizontal=True, sort='-odds_ratio', x_label="",
+                         y_label="Odds ratio vs lowest-risk answer")
+    else:
+        try:
+            assets.image("src/model_coefficients.png", 
+                     width=1000)
+        except FileNotFoundError:
+            st.error("Critical interpretation missing: Please ensure 'model_coefficients.png' exists in /src directory")
+            st.stop()
 
     # Clinical (coefficient)interpretation
     st.markdown("""
@@ -960,6 +1234,27 @@ elif st.session_state.page == 'ml':
             <li><strong>Race/Ethnicity is Asian:</strong> (0.74x odds reduction)</li>
         </ul>
         """, unsafe_allow_html=True)
+
+    # Scores of the current model over every survey respondent
+    if os.path.exists(preload.DATA_PATH):
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("### Risk Scores Across Survey Respondents")
+        try:
+            scores = pd.Series(load_scores(model, model_version, preload.data_version()))
+        except admission.Busy:
+            scores = None
+            st.info("⏳ The dataset is busy right now, please reload this page in a moment.")
+        if scores is not None:
+            threshold = model.named_steps['logreg'].threshold
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Respondents scored", f"{len(scores):,}")
+            c2.metric("Flagged high risk", f"{(scores >= threshold).mean():.1%}")
+            c3.metric("Median risk score", f"{scores.median():.2f}")
+            percentiles = [0.10, 0.25, 0.50, 0.75, 0.90, 0.99]
+            st.dataframe(pd.DataFrame({
+                'Percentile': [f"{int(q * 100)}th" for q in percentiles],
+                'Risk score': scores.quantile(percentiles).round(3).values,
+            }), hide_index=True)
     
 
 
@@ -986,12 +1281,11 @@ elif st.session_state.page == 'contact':
     st.markdown("""### Access to my CV:""")
 
     # Create a download button for your CV
-    with open('/mount/src/streamlit-heart-attack-prediction/CV-WillWu.pdf', 'rb') as file:
-        st.download_button(
-            label="Download CV",
-            data=file,
-            file_name="CV-WillWu.pdf",
-            mime="application/pdf"
-        )
+    st.download_button(
+        label="Download CV",
+        data=assets.read_binary('CV-WillWu.pdf'),
+        file_name="CV-WillWu.pdf",
+        mime="application/pdf"
+    )
 
 
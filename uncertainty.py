@@ -0,0 +1,156 @@
+"""Bootstrap intervals for an individual risk estimate.
+
+    python uncertainty.py                  # fit model/bootstrap_ensemble.joblib
+    python uncertainty.py --replicates 500
+    python uncertainty.py --benchmark      # interval latency vs a plain predict
+
+The shipped pipeline's encoder and scaler are kept fixed, as in online.py.
+The logistic regression is refit with the same hyperparameters on bootstrap
+resamples of train.py's training split, each undersampled like the
+original fit. At load time the replicates are folded through the scaler
+into one matrix of raw one-hot weights, so scoring a profile under every
+replicate is a single matrix-vector product. The interval is the spread of
+those scores around the shipped model's own score.
+"""
+import argparse
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.under_sampling import RandomUnderSampler
+from sklearn.base import clone
+
+import preload
+import scoring
+import train
+
+ENSEMBLE_PATH = 'model/bootstrap_ensemble.joblib'
+N_REPLICATES = 200
+# Central interval reported for a profile
+INTERVAL = 0.95
+
+
+def _fit_replicate(classifier, features, y, seed):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(y), len(y))
+    # Undersample the bootstrap's row indices, then gather only the kept rows
+    sampler = RandomUnderSampler(random_state=int(rng.integers(2 ** 31)))
+    kept, y_boot = sampler.fit_resample(rows.reshape(-1, 1), y[rows])
+    return clone(classifier).fit(features[kept[:, 0]], y_boot)
+
+
+def fit(model, checksum, data_path=preload.DATA_PATH, n_replicates=N_REPLICATES, n_jobs=-1):
+    """Bootstrap refits of the model's classifier, tagged with the checksum
+    of the artifact they belong to."""
+    X, y = train.load_training_data(data_path)
+    X_train, _, y_train, _ = train.split(X, y)
+    features = model[:-1].transform(X_train[scoring.INPUT_COLUMNS])
+    seeds = np.random.SeedSequence(train.RANDOM_STATE).spawn(n_replicates)
+    classifiers = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_fit_replicate)(model.steps[-1][1], features, y_train, seed) for seed in seeds)
+    return {'model_sha256': checksum, 'classifiers': classifiers}
+
+
+def stack(model, ensemble):
+    """Fold every replicate and the scaler into raw one-hot weights.
+
+    Returns {'weights': (replicates, one-hot columns), 'intercepts',
+    'columns': per question {answer: one-hot index}, 'width'}, or None if
+    the pipeline is not encoding -> scaler -> logreg."""
+    steps = model.named_steps
+    if list(steps) != ['encoding', 'scaler', 'logreg']:
+        return None
+    encoder, scaler = steps['encoding'], steps['scaler']
+    coefs = np.vstack([clf.coef_ for clf in ensemble['classifiers']])
+    intercepts = np.array([clf.intercept_[0] for clf in ensemble['classifiers']])
+    weights = coefs / scaler.scale_
+    intercepts = intercepts - weights @ scaler.mean_
+
+    columns, offset = {}, 0
+    for col, categories in zip(encoder.feature_names_in_, encoder.categories_):
+        columns[col] = {answer: offset + i for i, answer in enumerate(categories)}
+        offset += len(categories)
+    return {'weights': np.ascontiguousarray(weights), 'intercepts': intercepts, 'columns': columns,
+            'width': offset}
+
+
+def version(path=ENSEMBLE_PATH):
+    """sha256 of the ensemble file, or None if there is none; changes when an
+    ensemble is fitted or refitted."""
+    try:
+        return preload.model_version(path)
+    except FileNotFoundError:
+        return None
+
+
+def load(model, checksum, path=ENSEMBLE_PATH):
+    """Stacked ensemble for the model with this checksum, or None if there is
+    no ensemble for it (missing, or fitted for an earlier artifact)."""
+    if not os.path.exists(path):
+        return None
+    ensemble = joblib.load(path)
+    if ensemble['model_sha256'] != checksum:
+        return None
+    return stack(model, ensemble)
+
+
+def interval(stacked, answers, proba, threshold, level=INTERVAL):
+    """(low, high) interval around the model's `proba` for a dict of column ->
+    answer, and the share of replicates at or above `threshold`.
+
+    The replicates' spread in log-odds is centred on `proba`, so the interval
+    always brackets the score shown even if the ensemble was fitted on a
+    different extract of the data than the shipped model."""
+    x = np.zeros(stacked['width'])
+    for col in scoring.INPUT_COLUMNS:
+        # Answers the encoder never saw leave their one-hot block at zero
+        index = stacked['columns'][col].get(answers[col])
+        if index is not None:
+            x[index] = 1.0
+    logits = stacked['weights'] @ x + stacked['intercepts']
+    logits += np.log(proba / (1 - proba)) - logits.mean()
+    replicates = 1.0 / (1.0 + np.exp(-logits))
+    low, high = np.quantile(replicates, [(1 - level) / 2, (1 + level) / 2])
+    return float(low), float(high), float((replicates >= threshold).mean())
+
+
+def benchmark(model, stacked, repeats=2000):
+    answers = {col: cats[0] for col, cats in zip(scoring.INPUT_COLUMNS, model.named_steps['encoding'].categories_)}
+    input_df = pd.DataFrame([answers], columns=scoring.INPUT_COLUMNS)
+    for label, fn in (('predict', lambda: scoring.predict(model, input_df)),
+                      ('interval', lambda: interval(stacked, answers, 0.3, 0.5))):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn()
+        print(f"{label:<9} {(time.perf_counter() - start) / repeats * 1000:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=preload.DATA_PATH)
+    parser.add_argument('--replicates', type=int, default=N_REPLICATES)
+    parser.add_argument('--jobs', type=int, default=-1, help='parallel workers (-1 = all cores)')
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+
+    model = joblib.load(preload.MODEL_PATH)
+    if args.benchmark:
+        stacked = load(model, preload.model_version())
+        if stacked is None:
+            parser.exit(1, f"error: no ensemble for the current model at {ENSEMBLE_PATH}\n")
+        benchmark(model, stacked)
+        return
+    start = time.perf_counter()
+    ensemble = fit(model, preload.model_version(), args.data, args.replicates, args.jobs)
+    # Write then rename so the app never loads a half-written ensemble
+    tmp_path = f"{ENSEMBLE_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(ensemble, tmp_path)
+    os.replace(tmp_path, ENSEMBLE_PATH)
+    print(f"Wrote {ENSEMBLE_PATH}: {args.replicates} replicates in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()